@@ -0,0 +1,96 @@
+"""Account full-text search
+
+Revision ID: 3f6c1d2a9e47
+Revises: 8b15a24a2b23
+Create Date: 2026-10-18 06:10:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c1d2a9e47'
+down_revision: Union[str, None] = '8b15a24a2b23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_DATA_VALUES = "(SELECT group_concat(value, ' ') FROM json_each({row}.data))"
+
+
+def upgrade() -> None:
+    dialect_name = op.get_bind().dialect.name
+
+    if dialect_name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE account_fts USING fts5("
+            "name, data, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER account_fts_after_insert AFTER INSERT ON account
+              BEGIN
+                INSERT INTO account_fts (rowid, name, data)
+                VALUES (NEW.id, NEW.name, {SQLITE_DATA_VALUES.format(row='NEW')});
+              END;
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER account_fts_after_delete AFTER DELETE ON account
+              BEGIN
+                DELETE FROM account_fts WHERE rowid = OLD.id;
+              END;
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER account_fts_after_update
+              AFTER UPDATE OF name, data ON account
+              BEGIN
+                DELETE FROM account_fts WHERE rowid = OLD.id;
+                INSERT INTO account_fts (rowid, name, data)
+                VALUES (NEW.id, NEW.name, {SQLITE_DATA_VALUES.format(row='NEW')});
+              END;
+            """
+        )
+        op.execute(
+            f"""
+            INSERT INTO account_fts (rowid, name, data)
+            SELECT id, name, {SQLITE_DATA_VALUES.format(row='account')} FROM account
+            """
+        )
+
+    elif dialect_name == 'postgresql':
+        op.execute(
+            """
+            ALTER TABLE account ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(data, '{}'::json)), 'B')
+            ) STORED
+            """
+        )
+        op.create_index(
+            'ix__account__search_vector',
+            'account',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    dialect_name = op.get_bind().dialect.name
+
+    if dialect_name == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS account_fts_after_update')
+        op.execute('DROP TRIGGER IF EXISTS account_fts_after_delete')
+        op.execute('DROP TRIGGER IF EXISTS account_fts_after_insert')
+        op.execute('DROP TABLE IF EXISTS account_fts')
+
+    elif dialect_name == 'postgresql':
+        op.drop_index('ix__account__search_vector', table_name='account')
+        op.drop_column('account', 'search_vector')
@@ -0,0 +1,48 @@
+"""Account user and status indexes
+
+Revision ID: 498627764664
+Revises: 3f6c1d2a9e47
+Create Date: 2026-10-18 06:40:27.514093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '498627764664'
+down_revision: Union[str, None] = '3f6c1d2a9e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SQLite picks the composite index over a partial one,
+# so it is created for PostgreSQL only
+ACTIVE_WHERE = "status = 'active'"
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix__account__user_id__status__name',
+        'account',
+        ['user_id', 'status', 'name'],
+        unique=False,
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index(
+            'ix__account__user_id__name__active',
+            'account',
+            ['user_id', 'name', 'id'],
+            unique=False,
+            postgresql_where=sa.text(ACTIVE_WHERE),
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix__account__user_id__name__active', table_name='account')
+
+    op.drop_index('ix__account__user_id__status__name', table_name='account')
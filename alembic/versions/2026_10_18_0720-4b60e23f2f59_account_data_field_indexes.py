@@ -0,0 +1,52 @@
+"""Account data field indexes
+
+Revision ID: 4b60e23f2f59
+Revises: 498627764664
+Create Date: 2026-10-18 07:20:41.208316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b60e23f2f59'
+down_revision: Union[str, None] = '498627764664'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Status and name after the field keep keyset pages of active accounts sort-free
+FIELDS = ('login', 'email')
+EXPRESSIONS = {
+    'sqlite': "json_extract(data, '$.{field}')",
+    'postgresql': "(data ->> '{field}')",
+}
+
+
+def upgrade() -> None:
+    expression = EXPRESSIONS.get(op.get_bind().dialect.name)
+
+    if expression is None:
+        return
+
+    for field in FIELDS:
+        op.create_index(
+            f'ix__account__user_id__data_{field}__status__name',
+            'account',
+            ['user_id', sa.text(expression.format(field=field)), 'status', 'name'],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name not in EXPRESSIONS:
+        return
+
+    for field in FIELDS:
+        op.drop_index(
+            f'ix__account__user_id__data_{field}__status__name',
+            table_name='account',
+        )
@@ -0,0 +1,95 @@
+from itertools import count
+
+from apps.accounts.db.fields import parse_field_query
+from apps.accounts.db.fts import get_search_tokens
+from apps.accounts.schemas import AccountsPageModel
+from core.cache import RecentKeys, TTLCache
+from core.settings import settings
+
+search_cache = TTLCache(
+    maxsize=settings.accounts.search_cache_size,
+    ttl=settings.accounts.search_cache_ttl,
+)
+
+# Generations come from one global counter, so a user never gets
+# a generation number that was already used in cache keys
+_generation_counter = count(1)
+_generations: dict[int, int] = {}
+
+# A replica read right after a write could be cached under the new generation,
+# so the writer reads from the primary until replicas catch up
+_recent_writes = RecentKeys(ttl=settings.db.replica_lag_window)
+
+SearchKey = tuple[int, int, str, str, bool, bool, str | None, int | None]
+
+
+def get_generation(user_id: int) -> int:
+    return _generations.get(user_id, 0)
+
+
+def bump_generation(*users_ids: int) -> None:
+    """
+    Makes every cached search of the users unreachable,
+    must be called after the write is committed
+    """
+    for user_id in users_ids:
+        _generations[user_id] = next(_generation_counter)
+        _recent_writes.add(user_id)
+
+
+def can_read_replica(user_id: int) -> bool:
+    return user_id not in _recent_writes
+
+
+def normalize_query(query: str | None, exact_match: bool = False) -> str:
+    """
+    Full-text search only depends on word tokens (case-insensitive),
+    exact match, field match and the LIKE fallback use the raw query
+    """
+    if not query:
+        return ""
+
+    if exact_match or parse_field_query(query):
+        return query
+
+    tokens = get_search_tokens(query)
+
+    return " ".join(tokens).casefold() if tokens else query
+
+
+def make_search_key(
+    user_id: int,
+    name: str | None,
+    details: str | None,
+    exact_match: bool,
+    is_active: bool,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> SearchKey:
+    """
+    Must be made before the query runs, so results read before
+    a concurrent write are stored under the old generation
+    :return: SearchKey
+    """
+    return (
+        user_id,
+        get_generation(user_id),
+        normalize_query(name, exact_match),
+        normalize_query(details),
+        exact_match,
+        is_active,
+        cursor,
+        limit,
+    )
+
+
+def get_cached_search_page(key: SearchKey) -> AccountsPageModel | None:
+    return search_cache.get(key)
+
+
+def cache_search_page(key: SearchKey, accounts_page: AccountsPageModel) -> None:
+    search_cache.set(key, accounts_page)
+
+
+def get_search_cache_stats() -> dict[str, int]:
+    return search_cache.stats()
@@ -0,0 +1,44 @@
+import asyncio
+
+from sqlalchemy import TextClause, text
+
+from apps.accounts.db.fts import FTS_TABLE, SEARCH_VECTOR
+from core.settings import settings
+from database.utils import db, get_async_session
+
+
+def rebuild_index_statements(dialect_name: str) -> list[TextClause]:
+    if dialect_name == "sqlite":
+        return [
+            text(f"DELETE FROM {FTS_TABLE}"),
+            text(f"""
+                INSERT INTO {FTS_TABLE} (rowid, name, data)
+                SELECT id, name, (SELECT group_concat(value, ' ') FROM json_each(data))
+                FROM account
+                """),
+        ]
+
+    if dialect_name == "postgresql":
+        return [text(f"REINDEX INDEX ix__account__{SEARCH_VECTOR}")]
+
+    raise ValueError(f"Full-text search is not supported for `{dialect_name}`")
+
+
+async def backfill() -> None:
+    await db.init(settings.db.url)
+
+    try:
+        async with get_async_session() as async_session:
+            dialect_name = async_session.get_bind().dialect.name
+
+            for stmt in rebuild_index_statements(dialect_name):
+                await async_session.execute(stmt)
+
+            await async_session.commit()
+
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
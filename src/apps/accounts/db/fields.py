@@ -0,0 +1,43 @@
+from re import fullmatch
+
+# Keys of `Account.data` with an expression index (user_id, <key value>, status, name),
+# status and name keep keyset pages of active accounts sort-free
+INDEXED_FIELDS: tuple[str, ...] = ("login", "email")
+
+# Key value per dialect, shared by queries and the model indexes (the migration
+# repeats them): the planner only uses an expression index for the same expression
+FIELD_EXPRESSIONS: dict[str, str] = {
+    "sqlite": "json_extract(data, '$.{field}')",
+    "postgresql": "(data ->> '{field}')",
+}
+
+FIELD_QUERY_PATTERN: str = r"\s*(\w+)\s*=\s*(.*?)\s*"
+
+
+def parse_field_query(query: str | None) -> tuple[str, str] | None:
+    """
+    `login=foo` searches the `login` key of account data for the exact value.
+    Only `INDEXED_FIELDS` are keys, other queries (e.g. `a=b=c`) stay name searches
+    :return: field and value or None if the query is not field-scoped
+    """
+    if not query:
+        return None
+
+    match = fullmatch(FIELD_QUERY_PATTERN, query)
+
+    if match is None or match.group(1) not in INDEXED_FIELDS or not match.group(2):
+        return None
+
+    return match.group(1), match.group(2)
+
+
+def get_field_expression(dialect_name: str, field: str) -> str | None:
+    """
+    :return: SQL of the key value or None if the dialect has no JSON expression
+    """
+    expression = FIELD_EXPRESSIONS.get(dialect_name)
+    return expression.format(field=field) if expression is not None else None
+
+
+def get_index_name(table_name: str, field: str) -> str:
+    return f"ix__{table_name}__user_id__data_{field}__status__name"
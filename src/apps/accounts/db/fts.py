@@ -0,0 +1,64 @@
+from re import findall
+from typing import Any
+
+from sqlalchemy import Float, TableClause, column, func, literal_column, table
+
+FTS_TABLE: str = "account_fts"
+SEARCH_VECTOR: str = "search_vector"
+TS_CONFIG: str = "simple"
+
+
+def get_search_tokens(value: str | None) -> list[str]:
+    if not value:
+        return []
+
+    return findall(r"\w+", value)
+
+
+# ======================================|SQLite|======================================== #
+def build_sqlite_query(name_tokens: list[str], details_tokens: list[str]) -> str:
+    """
+    FTS5 query with prefix match per token, scoped to `name` and `data` columns
+    :return: str
+    """
+    expressions = []
+
+    for column_name, tokens in (("name", name_tokens), ("data", details_tokens)):
+        if tokens:
+            phrases = " ".join(f'"{token}"*' for token in tokens)
+            expressions.append(f"{column_name} : ({phrases})")
+
+    return " AND ".join(expressions)
+
+
+def sqlite_match(query: str) -> tuple[TableClause, Any, Any]:
+    fts_table = table(FTS_TABLE, column("rowid"))
+    fts_table_ref = literal_column(FTS_TABLE)
+
+    return (
+        fts_table,
+        fts_table_ref.op("MATCH")(query),
+        func.bm25(fts_table_ref, type_=Float),
+    )
+
+
+# ====================================|PostgreSQL|====================================== #
+def build_postgresql_query(name_tokens: list[str], details_tokens: list[str]) -> str:
+    """
+    tsquery with prefix match per token, `A` weight is name, `B` weight is data
+    :return: str
+    """
+    lexemes = [f"{token}:*A" for token in name_tokens]
+    lexemes.extend(f"{token}:*B" for token in details_tokens)
+
+    return " & ".join(lexemes)
+
+
+def postgresql_match(query: str) -> tuple[Any, Any]:
+    search_vector = literal_column(SEARCH_VECTOR)
+    ts_query = func.to_tsquery(TS_CONFIG, query)
+
+    return (
+        search_vector.op("@@")(ts_query),
+        -func.ts_rank(search_vector, ts_query, type_=Float),
+    )
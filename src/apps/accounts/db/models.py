@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, Index
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from apps.accounts.db.fields import FIELD_EXPRESSIONS, INDEXED_FIELDS, get_index_name
 from apps.accounts.schemas import AccountStatus
 from database.base import Base
 from database.tps import json_col, str_100
@@ -13,6 +14,24 @@ if TYPE_CHECKING:
     from apps.auth.db.models import User
 
 
+def get_field_indexes(table_name: str) -> list[Index]:
+    """
+    (user_id, <data key>, status, name) per indexed key and dialect
+    :return: list of indexes
+    """
+    return [
+        Index(
+            get_index_name(table_name, field),
+            "user_id",
+            text(expression.format(field=field)),
+            "status",
+            "name",
+        ).ddl_if(dialect=dialect)
+        for field in INDEXED_FIELDS
+        for dialect, expression in FIELD_EXPRESSIONS.items()
+    ]
+
+
 class Account(Base):
     __tablename__ = "account"
     repr_cols = ("id", "name", "data")
@@ -25,4 +44,22 @@ class Account(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
     user: Mapped[User] = relationship(back_populates="accounts")
     # ===================================|Table args|=================================== #
-    __table_args__ = (Index(f"ix__{__tablename__}__name", "name"),)
+    __table_args__ = (
+        Index(f"ix__{__tablename__}__name", "name"),
+        Index(
+            f"ix__{__tablename__}__user_id__status__name",
+            "user_id",
+            "status",
+            "name",
+        ),
+        # Active rows in keyset order, SQLite always prefers the composite index above
+        Index(
+            f"ix__{__tablename__}__user_id__name__active",
+            "user_id",
+            "name",
+            "id",
+            postgresql_where=text(f"status = '{AccountStatus.active}'"),
+        ).ddl_if(dialect="postgresql"),
+        # Field-scoped search (`login=foo`)
+        *get_field_indexes(__tablename__),
+    )
@@ -1,44 +1,130 @@
-from typing import Any
+from itertools import batched
+from typing import Any, AsyncGenerator, Iterable, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import Select, delete, literal, literal_column, select, update
 
+from apps.accounts.db.fields import get_field_expression, parse_field_query
+from apps.accounts.db.fts import (
+    build_postgresql_query,
+    build_sqlite_query,
+    get_search_tokens,
+    postgresql_match,
+    sqlite_match,
+)
 from apps.accounts.db.models import Account
 from apps.accounts.schemas import AccountStatus
 from core.schemas import PaginationResultModel
-from database.mixins import PaginationMixin
+from database.mixins import DEFAULT_BATCH_SIZE, PaginationMixin
+
+# Rendered inline, so the partial index on active accounts matches the statement
+IS_ACTIVE = Account.status == literal(
+    AccountStatus.active,
+    Account.status.type,
+    literal_execute=True,
+)
 
 
 class AccountDatabase(PaginationMixin):
     __table__ = Account
 
-    @classmethod
-    def __build_search_condition(
-        cls,
+    def __build_fulltext_search(
+        self,
+        stmt: Select,
+        name: str | None = None,
+        details: str | None = None,
+    ) -> tuple[Select, Any | None] | None:
+        name_tokens = get_search_tokens(name)
+        details_tokens = get_search_tokens(details)
+
+        if not name_tokens and not details_tokens:
+            return None
+
+        dialect_name = self.async_session.get_bind().dialect.name
+
+        if dialect_name == "sqlite":
+            fts_table, match, rank = sqlite_match(
+                build_sqlite_query(name_tokens, details_tokens),
+            )
+            # Materialized: with a plain join the planner may walk the user's accounts
+            # by index and run the MATCH once per row
+            matches = (
+                select(fts_table.c.rowid, rank.label("rank"))
+                .where(match)
+                .cte("account_matches")
+                .prefix_with("MATERIALIZED")
+            )
+            stmt = stmt.join(matches, matches.c.rowid == Account.id)
+            return stmt, matches.c.rank
+
+        if dialect_name == "postgresql":
+            match, rank = postgresql_match(
+                build_postgresql_query(name_tokens, details_tokens),
+            )
+            return stmt.where(match), rank
+
+        return None
+
+    def __build_field_match(self, field: str, value: str) -> Any:
+        """
+        Exact match of one data key, an index seek for `INDEXED_FIELDS`
+        :return: where clause
+        """
+        dialect_name = self.async_session.get_bind().dialect.name
+        expression = get_field_expression(dialect_name, field)
+
+        if expression is None:
+            return Account.data[field].as_string() == value
+
+        return literal_column(expression) == value
+
+    def __build_search_stmt(
+        self,
         user_id: int,
         accounts_ids: list[int] | tuple[int] | None = None,
         name: str | None = None,
         details: str | None = None,
         is_active: bool = True,
         exact_match: bool = False,
-    ) -> list:
-        where = [Account.user_id == user_id]
+    ) -> tuple[Select, Any | None]:
+        """
+        Name and details are matched through the full-text index when it is available,
+        a `field=value` name or details matches the data key instead
+        :return: statement and rank expression (lower is better) or None
+        """
+        stmt = select(Account).where(Account.user_id == user_id)
+        rank = None
 
         if accounts_ids:
-            where.append(Account.id.in_(accounts_ids))
+            stmt = stmt.where(Account.id.in_(accounts_ids))
+
+        if field_query := parse_field_query(name):
+            stmt = stmt.where(self.__build_field_match(*field_query))
+            name = None
 
-        if name:
-            if exact_match:
-                where.append(Account.name == name)
-            else:
-                where.append(Account.name.contains(name))
+        if field_query := parse_field_query(details):
+            stmt = stmt.where(self.__build_field_match(*field_query))
+            details = None
 
-        if details:
-            where.append(Account.data.contains(details))
+        if name and exact_match:
+            stmt = stmt.where(Account.name == name)
+            name = None
+
+        fulltext_search = self.__build_fulltext_search(stmt, name, details)
+
+        if fulltext_search:
+            stmt, rank = fulltext_search
+
+        else:
+            if name:
+                stmt = stmt.where(Account.name.contains(name))
+
+            if details:
+                stmt = stmt.where(Account.data.contains(details))
 
         if is_active:
-            where.append(Account.status.is_(AccountStatus.active))
+            stmt = stmt.where(IS_ACTIVE)
 
-        return where
+        return stmt, rank
 
     async def search_by_name_or_details(
         self,
@@ -50,8 +136,15 @@ class AccountDatabase(PaginationMixin):
         exact_match: bool = False,
         limit: int | None = None,
         order_by: Any | None = None,
+        cursor: str | None = None,
+        keyset: bool = False,
+        with_total: bool = False,
     ) -> PaginationResultModel:
-        where = self.__build_search_condition(
+        """
+        Full-text matches are ordered by relevance (ties by id) instead of `order_by`
+        :return: PaginationResultModel
+        """
+        stmt, rank = self.__build_search_stmt(
             user_id=user_id,
             name=name,
             details=details,
@@ -59,11 +152,17 @@ class AccountDatabase(PaginationMixin):
             exact_match=exact_match,
         )
 
+        if rank is not None:
+            order_by = rank
+
         return await self.paginated_result(
-            stmt=select(Account).where(*where),
+            stmt=stmt,
             page=page,
             limit=limit,
             order_by=order_by,
+            cursor=cursor,
+            keyset=keyset,
+            with_total=with_total,
         )
 
     async def search_by_id(
@@ -74,16 +173,73 @@ class AccountDatabase(PaginationMixin):
         is_active: bool = True,
         limit: int | None = None,
         order_by: Any | None = None,
-    ):
-        where = self.__build_search_condition(
+        cursor: str | None = None,
+        keyset: bool = False,
+        with_total: bool = False,
+    ) -> PaginationResultModel:
+        stmt, _ = self.__build_search_stmt(
             user_id=user_id,
             accounts_ids=accounts_ids,
             is_active=is_active,
         )
 
         return await self.paginated_result(
-            stmt=select(Account).where(*where),
+            stmt=stmt,
             page=page,
             limit=limit,
             order_by=order_by,
+            cursor=cursor,
+            keyset=keyset,
+            with_total=with_total,
+        )
+
+    def stream_by_id(
+        self,
+        user_id: int,
+        accounts_ids: list[int] | tuple[int] | None = None,
+        is_active: bool = True,
+        **stream_options,
+    ) -> AsyncGenerator[Sequence[Account], None]:
+        stmt, _ = self.__build_search_stmt(
+            user_id=user_id,
+            accounts_ids=accounts_ids,
+            is_active=is_active,
         )
+
+        return self.astream_load(stmt, **stream_options)
+
+    async def delete_by_id(
+        self,
+        user_id: int,
+        accounts_ids: Iterable[int],
+        soft_delete: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        commit: bool = True,
+    ) -> list[int]:
+        """
+        Ownership and status are checked inside the statement,
+        one `UPDATE`/`DELETE ... RETURNING id` per batch of ids
+        :return: ids of affected accounts
+        """
+        if soft_delete:
+            stmt = update(Account).values(status=AccountStatus.deleted)
+        else:
+            stmt = delete(Account)
+
+        stmt = stmt.where(
+            Account.user_id == user_id,
+            IS_ACTIVE,
+        ).execution_options(synchronize_session=False)
+
+        affected_ids = []
+
+        for ids_batch in batched(dict.fromkeys(accounts_ids), batch_size):
+            result = await self.async_session.scalars(
+                stmt.where(Account.id.in_(ids_batch)).returning(Account.id),
+            )
+            affected_ids.extend(result.all())
+
+        if commit:
+            await self.commit()
+
+        return affected_ids
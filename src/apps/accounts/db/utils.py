@@ -7,6 +7,13 @@ from database.utils import get_async_session
 
 
 @asynccontextmanager
-async def get_acc_db() -> AbstractAsyncContextManager[AccountDatabase]:
-    async with get_async_session() as async_session:  # type: AsyncSession
+async def get_acc_db(
+    readonly: bool = False,
+) -> AbstractAsyncContextManager[AccountDatabase]:
+    """
+    :param readonly: use a read replica when configured, reads may lag behind writes
+    """
+    async with get_async_session(
+        readonly=readonly
+    ) as async_session:  # type: AsyncSession
         yield AccountDatabase(async_session)
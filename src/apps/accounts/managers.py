@@ -1,18 +1,25 @@
 # TODO: Переделать работу на менеджера
-from datetime import datetime
-from json import dumps, loads
+from codecs import getincrementaldecoder
+from functools import partial
+from io import IncrementalNewlineDecoder
+from json import JSONDecodeError, JSONDecoder, dumps
 from logging import getLogger
-from pathlib import Path
+from textwrap import indent as textwrap_indent
+from typing import AsyncGenerator, AsyncIterator, Sequence
 
-from fastapi import UploadFile
+from fastapi import UploadFile, status
 
+from apps.accounts.cache import bump_generation, can_read_replica
 from apps.accounts.db.models import Account
 from apps.accounts.db.utils import get_acc_db
-from apps.accounts.schemas import AccountStatus, ExportModel, ExportType
-from apps.accounts.utils import search_accounts_by_ids
+from apps.accounts.schemas import (
+    AccountCreateModel,
+    ExportModel,
+    ExportType,
+)
 from apps.auth.db.models import User
 from core.settings import settings
-from exceptions import APIError, NotFoundError
+from exceptions import APIError
 
 logger = getLogger(__name__)
 
@@ -23,149 +30,270 @@ class AccountManager:
         user: User,
         accounts_ids: list[int] | tuple[int],
         soft_delete: bool = True,
-    ) -> None:
-        true_accs = await search_accounts_by_ids(user, accounts_ids)
-
-        if not true_accs:
-            raise NotFoundError("Accounts not found")
-
+    ) -> list[int]:
+        """
+        Deletes only active accounts owned by the user, unknown ids are skipped
+        :return: ids of deleted accounts, empty if none matched
+        """
         async with get_acc_db() as acc_db:
-            true_accs_ids = [acc.id for acc in true_accs]
-
-            if soft_delete:
-                list_of_update_dict = [
-                    {"id": acc_id, "status": AccountStatus.deleted}
-                    for acc_id in true_accs_ids
-                ]
+            deleted_ids = await acc_db.delete_by_id(
+                user.id,
+                accounts_ids,
+                soft_delete=soft_delete,
+            )
 
-                return await acc_db.update(list_of_update_dict)
+            if deleted_ids:
+                acc_db.on_commit(partial(bump_generation, user.id))
 
-            return await acc_db.delete([acc_db.__table__.id.in_(true_accs_ids)])
+        return deleted_ids
 
 
-class AccountsFileManger:
-    temp_dir = settings.temp_dir
+class Exporter:
+    fieldnames = ("name", "data")
+    default_indent = 4
+    media_type = "multipart/form-data"
 
     def __init__(
         self,
         user: User,
+        export_model: ExportModel,
         encoding: str = settings.base_encoding,
     ) -> None:
-        self.encoding = encoding
         self.user = user
+        self.encoding = encoding
+        self.type = export_model.export_type
+        self.accounts_ids = export_model.accounts_ids
+        self.file_name = f"Accounts.{self.type}"
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"content-disposition": f'attachment; filename="{self.file_name}"'}
+
+    def encode_json(
+        self,
+        data: Sequence[Account],
+        is_first_chunk: bool,
+        indent: int = default_indent,
+    ) -> str:
+        """
+        Chunk of `dumps(accounts, indent=indent)` output without the enclosing brackets
+        """
+        items = []
 
-        self.path: Path | None = None
+        for acc in data:
+            dump_item = {
+                fieldname: getattr(acc, fieldname) for fieldname in self.fieldnames
+            }
+            items.append(textwrap_indent(dumps(dump_item, indent=indent), " " * indent))
 
-    def delete(self) -> None:
-        if self.path:
-            self.path.unlink(missing_ok=True)
-            self.path = None
+        prefix = "" if is_first_chunk else ",\n"
+        return prefix + ",\n".join(items)
 
+    def encode_text(self, data: Sequence[Account], indent: int = default_indent) -> str:
+        lines = []
 
-class Exporter(AccountsFileManger):
-    fieldnames = ("name", "data")
-    default_indent = 4
+        for acc in data:
+            lines.append(f"Name: {acc.name}\n")
+
+            for key, value in acc.data.items():  # type: str, str
+                lines.append(f"{" " * indent}{key.capitalize()}:\n")
+                lines.append(f"{" " * indent * 2}{value}\n")
+
+        return "".join(lines)
+
+    async def iter_export(self) -> AsyncGenerator[bytes, None]:
+        is_first_chunk = True
+
+        # Runs after the response has started and the request session is closed,
+        # so this opens its own session for the whole stream
+        async with get_acc_db(
+            readonly=can_read_replica(self.user.id),
+        ) as acc_db:
+            async for accounts in acc_db.stream_by_id(
+                user_id=self.user.id,
+                accounts_ids=self.accounts_ids,
+            ):  # type: Sequence[Account]
+                if self.type is ExportType.json:
+                    chunk = self.encode_json(accounts, is_first_chunk)
+
+                    if is_first_chunk:
+                        chunk = "[\n" + chunk
+
+                else:
+                    chunk = self.encode_text(accounts)
+
+                is_first_chunk = False
+
+                yield chunk.encode(self.encoding)
+
+        if self.type is ExportType.json:
+            yield ("[]" if is_first_chunk else "\n]").encode(self.encoding)
+
+
+class Uploader:
+    chunk_size = settings.accounts.upload_chunk_size
+    max_size = settings.accounts.upload_max_size
+    batch_size = settings.accounts.upload_batch_size
 
     def __init__(
         self,
         user: User,
-        export_model: ExportModel,
         encoding: str = settings.base_encoding,
     ) -> None:
-        super().__init__(user, encoding)
-        self.type = export_model.export_type
-        self.accounts_ids = export_model.accounts_ids
-        self.file_name = f"Accounts.{self.type}"
-        self.path = self.temp_dir / f"{datetime.now().timestamp()}.{self.type}"
-
-    def create_json(self, data: list[Account], indent: int = default_indent) -> None:
-        dump_data = []
+        self.encoding = encoding
+        self.user = user
 
-        for acc in data:
-            dump_data.append(
-                {fieldname: getattr(acc, fieldname) for fieldname in self.fieldnames}
+    def __check_size(self, size: int | None) -> None:
+        if size is not None and size > self.max_size:
+            raise APIError(
+                f"Файл больше {self.max_size // 1_048_576} МБ",
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                locations=["upload"],
             )
 
-        with self.path.open(mode="w", encoding=self.encoding) as file:
-            file.write(dumps(dump_data, indent=indent))
+    async def __iter_text(
+        self,
+        uploaded_file: UploadFile,
+        encoding: str,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Decoded upload chunks, newlines are translated as in text mode `open()`
+        """
+        decoder = IncrementalNewlineDecoder(
+            getincrementaldecoder(encoding)(),
+            translate=True,
+        )
+        read_size = 0
+
+        while chunk := await uploaded_file.read(self.chunk_size):
+            read_size += len(chunk)
+            self.__check_size(read_size)
+
+            if text := decoder.decode(chunk):
+                yield text
+
+        if text := decoder.decode(b"", final=True):
+            yield text
+
+    @classmethod
+    async def __iter_lines(
+        cls, text_chunks: AsyncIterator[str]
+    ) -> AsyncGenerator[str, None]:
+        tail = ""
+
+        async for text in text_chunks:
+            lines = (tail + text).split("\n")
+            tail = lines.pop()
+
+            for line in lines:
+                yield line + "\n"
+
+        if tail:
+            yield tail
+
+    def __make_account(self, account_dict: dict) -> dict:
+        account_create = AccountCreateModel.model_validate(account_dict)
+        return {"user_id": self.user.id, **account_create.model_dump()}
+
+    async def __parse_txt_accounts(
+        self,
+        uploaded_file: UploadFile,
+    ) -> AsyncGenerator[dict, None]:
+        name = None
 
-    def create_text(self, data: list[Account], indent: int = default_indent) -> None:
-        with self.path.open(mode="w", encoding=self.encoding) as file:
-            for acc in data:
-                file.write(f"Name: {acc.name}\n")
+        data = {}
+        data_item_name = None
 
-                for key, value in acc.data.items():  # type: str, str
-                    file.write(f"{" " * indent}{key.capitalize()}:\n")
-                    file.write(f"{" " * indent * 2}{value}\n")
+        async for line in self.__iter_lines(
+            self.__iter_text(uploaded_file, self.encoding)
+        ):
+            if line == "\n":
+                continue
 
-    async def make_export(self) -> None:
-        accounts = await search_accounts_by_ids(self.user, self.accounts_ids)
+            if line[:5] == "Name:":
+                if name:
+                    yield self.__make_account({"name": name, "data": data})
 
-        if self.type is ExportType.json:
-            self.create_json(accounts)
-        elif self.type is ExportType.txt:
-            self.create_text(accounts)
+                name = line[5:].strip()
 
+                data = {}
+                data_item_name = None
 
-class Uploader(AccountsFileManger):
-    temp_dir = settings.temp_dir
+                continue
 
-    async def __write_uploaded_file(self, uploaded_file: UploadFile) -> None:
-        data = await uploaded_file.read()
+            line = line.strip()
 
-        self.path = self.temp_dir / uploaded_file.filename
+            if data_item_name is None:
+                data_item_name = line.strip(":")
 
-        with self.path.open(mode="wb", encoding=self.encoding) as file:
-            file.write(data)
+            else:
+                data[data_item_name] = line
 
-    def __parse_txt_accounts(self) -> list[Account]:
-        accounts = []
+                data_item_name = None
 
-        with self.path.open(mode="r", encoding=self.encoding) as file:
-            name = None
+        if name is not None:
+            yield self.__make_account({"name": name, "data": data})
 
-            data = {}
-            data_item_name = None
+    async def __parse_json_accounts(
+        self,
+        uploaded_file: UploadFile,
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Incremental parser for a top level JSON array of account objects
+        """
+        decoder = JSONDecoder()
 
-            for line in file.readlines():
-                if line == "\n":
-                    continue
+        buffer = ""
+        position = 0
+        expected = "["
 
-                if line[:5] == "Name:":
-                    if name:
-                        accounts.append(
-                            Account(name=name, data=data, user_id=self.user.id)
-                        )
+        async for text in self.__iter_text(uploaded_file, settings.base_encoding):
+            buffer = buffer[position:] + text
+            position = 0
 
-                    name = line[5:].strip()
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
 
-                    data = {}
-                    data_item_name = None
+                if position == len(buffer):
+                    break
 
-                    continue
+                char = buffer[position]
 
-                line = line.strip()
+                if expected == "[":
+                    if char != "[":
+                        raise ValueError(f"Expected `[` at {position}")
 
-                if data_item_name is None:
-                    data_item_name = line.strip(":")
+                    position += 1
+                    expected = "item or ]"
 
-                else:
-                    data[data_item_name] = line
+                elif expected in ("item or ]", "item"):
+                    if char == "]" and expected == "item or ]":
+                        position += 1
+                        expected = "end"
+                        continue
 
-                    data_item_name = None
+                    try:
+                        account_dict, position = decoder.raw_decode(buffer, position)
 
-            accounts.append(Account(name=name, data=data, user_id=self.user.id))
+                    except JSONDecodeError:
+                        break  # Note: Объект не дочитан, ждём следующий кусок
 
-        return accounts
+                    yield self.__make_account(account_dict)
+                    expected = ", or ]"
 
-    def __parse_json_accounts(self) -> list[Account]:
-        accounts = []
+                elif expected == ", or ]":
+                    if char not in ",]":
+                        raise ValueError(f"Expected `,` or `]` at {position}")
 
-        with self.path.open(mode="r", encoding=settings.base_encoding) as file:
-            for account_dict in loads(file.read()):  # type: dict
-                accounts.append(Account(**account_dict, user_id=self.user.id))
+                    position += 1
+                    expected = "item" if char == "," else "end"
 
-        return accounts
+                else:
+                    raise ValueError(f"Unexpected data after JSON array at {position}")
+
+        if expected != "end":
+            raise ValueError("Unexpected end of JSON data")
 
     def __get_file_type(self, filename: str) -> str:
         spited_filename = filename.split(".")
@@ -182,26 +310,38 @@ class Uploader(AccountsFileManger):
             )
         return file_type
 
-    async def extract_accounts_from_uploaded_file(
+    async def iter_accounts(
         self,
         uploaded_file: UploadFile,
-    ) -> list[Account]:
+    ) -> AsyncGenerator[list[dict], None]:
+        """
+        Accounts parsed from the upload stream in batches of `batch_size`
+        """
         file_type = self.__get_file_type(uploaded_file.filename)
+        self.__check_size(uploaded_file.size)
 
-        await self.__write_uploaded_file(uploaded_file)
+        if file_type == ExportType.txt:
+            accounts = self.__parse_txt_accounts(uploaded_file)
+        else:
+            accounts = self.__parse_json_accounts(uploaded_file)
+
+        batch = []
 
         try:
-            if file_type == ExportType.txt:
-                accounts = self.__parse_txt_accounts()
-            else:
-                accounts = self.__parse_json_accounts()
+            async for account in accounts:
+                batch.append(account)
+
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+
+        except APIError:
+            raise
 
         except Exception as ex:
             logger.warning("File error: %s", ex)
 
             raise APIError("Ошибка распознавания файла", locations=["upload"])
 
-        finally:
-            self.delete()
-
-        return accounts
+        if batch:
+            yield batch
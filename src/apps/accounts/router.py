@@ -1,24 +1,31 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Form, UploadFile, status
+from fastapi import APIRouter, Depends, Form, Query, UploadFile, status
 from fastapi.requests import Request
 from fastapi.responses import HTMLResponse
-from starlette.background import BackgroundTask
-from starlette.responses import FileResponse
+from starlette.responses import StreamingResponse
 from starlette.templating import _TemplateResponse  # noqa
 
 from apps.accounts.managers import AccountManager, Exporter, Uploader
-from apps.accounts.schemas import AccountCreateModel, AccountUpdateModel, ExportModel
+from apps.accounts.schemas import (
+    AccountCreateModel,
+    AccountsPageModel,
+    AccountUpdateModel,
+    DeleteModel,
+    DeleteResultModel,
+    ExportModel,
+)
 from apps.accounts.utils import (
     create_accounts,
     create_new_account,
     get_encoding_by_user_agent,
-    search_account_by_name,
+    search_accounts_page,
     update_account,
 )
-from apps.auth.utils import login_require
+from apps.auth.utils import login_require, resolve_user
 from core.ctx_proc import render_template
 from core.settings import settings
+from exceptions import NotFoundError
 
 app_name = "accounts"
 router = APIRouter()
@@ -28,11 +35,13 @@ router = APIRouter()
     path=settings.search_url,
     response_class=HTMLResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(resolve_user)],
 )
 @router.get(
     path=settings.home_url,
     response_class=HTMLResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(resolve_user)],
 )
 async def home(
     request: Request,
@@ -44,6 +53,7 @@ async def home(
     settings.search_url,
     response_class=HTMLResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(resolve_user)],
 )
 async def accounts_search(
     request: Request,
@@ -52,13 +62,15 @@ async def accounts_search(
     user = request.user
 
     if user and user.is_active:
-        accounts = await search_account_by_name(user, name=search)
+        accounts_page = await search_accounts_page(user, name=search)
     else:
-        accounts = None
+        accounts_page = AccountsPageModel(accounts=[])
 
     context = {
         "SEARCH_RESULT": True,
-        "accounts": accounts,
+        "SEARCH_QUERY": search,
+        "accounts": accounts_page.accounts,
+        "next_cursor": accounts_page.next_cursor,
     }
 
     return render_template(
@@ -68,6 +80,36 @@ async def accounts_search(
     )
 
 
+@router.get(
+    f"/{app_name}/search",
+    dependencies=[Depends(login_require)],
+    response_model=AccountsPageModel,
+    status_code=status.HTTP_200_OK,
+)
+async def accounts_search_page(
+    request: Request,
+    search: str,
+    limit: Annotated[
+        int,
+        Query(ge=1, le=settings.accounts.search_max_page_size),
+    ] = settings.accounts.search_page_size,
+    cursor: str | None = None,
+    exact_match: bool = False,
+):
+    user = request.user
+
+    if not (user and user.is_active):
+        return AccountsPageModel(accounts=[])
+
+    return await search_accounts_page(
+        user,
+        name=search,
+        exact_match=exact_match,
+        limit=limit,
+        cursor=cursor,
+    )
+
+
 @router.post(
     f"/{app_name}/create",
     status_code=status.HTTP_201_CREATED,
@@ -101,18 +143,15 @@ async def accounts_import(
         request.user,
         encoding=get_encoding_by_user_agent(request),
     )
-    accounts = await uploader.extract_accounts_from_uploaded_file(file)
-
-    if accounts:
-        await create_accounts(accounts)
+    created_accounts = await create_accounts(uploader.iter_accounts(file))
 
-    return {"created_accounts": len(accounts)}
+    return {"created_accounts": created_accounts}
 
 
 @router.post(
     f"/{app_name}/export",
     dependencies=[Depends(login_require)],
-    response_class=FileResponse,
+    response_class=StreamingResponse,
     status_code=status.HTTP_200_OK,
 )
 async def accounts_export(request: Request, export_model: ExportModel):
@@ -121,15 +160,11 @@ async def accounts_export(request: Request, export_model: ExportModel):
         export_model,
         encoding=get_encoding_by_user_agent(request),
     )
-    delete_task = BackgroundTask(func=exporter.delete)
-
-    await exporter.make_export()
 
-    return FileResponse(
-        path=exporter.path,
-        filename=exporter.file_name,
-        media_type="multipart/form-data",
-        background=delete_task,
+    return StreamingResponse(
+        content=exporter.iter_export(),
+        media_type=exporter.media_type,
+        headers=exporter.headers,
     )
 
 
@@ -141,4 +176,19 @@ async def accounts_export(request: Request, export_model: ExportModel):
 )
 async def accounts_delete(request: Request, account_id: int):
     account_manager = AccountManager()
-    await account_manager.delete(request.user, [account_id])
+
+    if not await account_manager.delete(request.user, [account_id]):
+        raise NotFoundError("Accounts not found")
+
+
+@router.delete(
+    f"/{app_name}/delete",
+    dependencies=[Depends(login_require)],
+    response_model=DeleteResultModel,
+    status_code=status.HTTP_200_OK,
+)
+async def accounts_bulk_delete(request: Request, delete_model: DeleteModel):
+    account_manager = AccountManager()
+    deleted_ids = await account_manager.delete(request.user, delete_model.accounts_ids)
+
+    return DeleteResultModel(deleted_accounts=deleted_ids)
@@ -1,6 +1,8 @@
 from enum import StrEnum, auto
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+
+from core.settings import settings
 
 
 class AccountStatus(StrEnum):
@@ -19,6 +21,19 @@ class AccountUpdateModel(AccountCreateModel):
     id: int
 
 
+class AccountReadModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    data: dict
+
+
+class AccountsPageModel(BaseModel):
+    accounts: list[AccountReadModel]
+    next_cursor: str | None = None
+
+
 class ExportType(StrEnum):
     json = auto()
     txt = auto()
@@ -27,3 +42,14 @@ class ExportType(StrEnum):
 class ExportModel(BaseModel):
     accounts_ids: list[int] | tuple[int]
     export_type: ExportType = ExportType.txt
+
+
+class DeleteModel(BaseModel):
+    accounts_ids: list[int] = Field(
+        min_length=1,
+        max_length=settings.accounts.delete_max_ids,
+    )
+
+
+class DeleteResultModel(BaseModel):
+    deleted_accounts: list[int]
@@ -1,80 +1,115 @@
 from enum import StrEnum
-from typing import Sequence
+from functools import partial
+from typing import AsyncIterable
 
 from fastapi.requests import Request
 
+from apps.accounts.cache import (
+    bump_generation,
+    cache_search_page,
+    can_read_replica,
+    get_cached_search_page,
+    make_search_key,
+)
 from apps.accounts.db.models import Account
 from apps.accounts.db.orm import AccountDatabase
 from apps.accounts.db.utils import get_acc_db
-from apps.accounts.schemas import AccountCreateModel, AccountUpdateModel
+from apps.accounts.schemas import (
+    AccountCreateModel,
+    AccountReadModel,
+    AccountsPageModel,
+    AccountUpdateModel,
+)
 from apps.auth.db.models import User
+from core.settings import settings
 
 
-async def search_account_by_name(
+async def search_accounts_page(
     user: User,
     name: str | None = None,
     details: str | None = None,
     is_active: bool = True,
     exact_match: bool = False,
-) -> list[Account]:
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> AccountsPageModel:
+    """
+    One keyset page ordered by name or by rank for full-text matches,
+    `next_cursor` loads the next one
+    :return: AccountsPageModel
+    """
     if name == "*":
         name = ""
 
-    results = []
+    if limit is None:
+        limit = settings.accounts.search_page_size
+
+    limit = min(limit, settings.accounts.search_max_page_size)
+
+    cache_key = make_search_key(
+        user.id,
+        name,
+        details,
+        exact_match,
+        is_active,
+        cursor=cursor,
+        limit=limit,
+    )
+    accounts_page = get_cached_search_page(cache_key)
+
+    if accounts_page is not None:
+        return accounts_page
+
+    async with get_acc_db(
+        readonly=can_read_replica(user.id),
+    ) as acc_db:  # type: AccountDatabase
+        result = await acc_db.search_by_name_or_details(
+            user_id=user.id,
+            name=name,
+            details=details,
+            is_active=is_active,
+            exact_match=exact_match,
+            limit=limit,
+            order_by=Account.name,
+            cursor=cursor,
+            keyset=True,
+        )
+
+    accounts_page = AccountsPageModel(
+        accounts=[AccountReadModel.model_validate(account) for account in result.data],
+        next_cursor=result.next_cursor,
+    )
+    cache_search_page(cache_key, accounts_page)
+
+    return accounts_page
+
+
+async def create_accounts(batches: AsyncIterable[list[dict]]) -> int:
+    """
+    Batches are inserted one by one and committed in a single transaction
+    :return: created accounts count
+    """
+    created_count = 0
+    users_ids = set()
 
     async with get_acc_db() as acc_db:  # type: AccountDatabase
-        load_options = {
-            "user_id": user.id,
-            "name": name,
-            "details": details,
-            "is_active": is_active,
-            "exact_match": exact_match,
-            "order_by": Account.name,
-        }
+        async for accounts in batches:
+            await acc_db.bulk_create(accounts, commit=False)
+            created_count += len(accounts)
+            users_ids.update(account["user_id"] for account in accounts)
 
-        async for accounts in acc_db.aiter_load(
-            acc_db.search_by_name_or_details,
-            **load_options,
-        ):  # type: Sequence[Account]
+        await acc_db.commit()
+        acc_db.on_commit(partial(bump_generation, *users_ids))
 
-            results.extend(accounts)
-
-    return results
-
-
-async def search_accounts_by_ids(
-    user: User,
-    accounts_ids: list[int] | tuple[int] | None = None,
-    is_active: bool = True,
-) -> list[Account]:
-    results = []
-
-    async with get_acc_db() as acc_db:  # type: AccountDatabase
-        load_options = {
-            "user_id": user.id,
-            "accounts_ids": accounts_ids,
-            "is_active": is_active,
-        }
-
-        async for accounts in acc_db.aiter_load(
-            acc_db.search_by_id,
-            **load_options,
-        ):  # type: Sequence[Account]
-            results.extend(accounts)
-
-    return results
-
-
-async def create_accounts(accounts: list[Account]) -> None:
-    async with get_acc_db() as acc_db:  # type: AccountDatabase
-        await acc_db.create(accounts)
+    return created_count
 
 
 async def create_new_account(user_id: int, account_create: AccountCreateModel) -> None:
     async with get_acc_db() as acc_db:  # type: AccountDatabase
         create_account_dict = {"user_id": user_id, **account_create.model_dump()}
 
-        await acc_db.create([create_account_dict])
+        await acc_db.bulk_create([create_account_dict])
+        acc_db.on_commit(partial(bump_generation, user_id))
 
 
 async def update_account(user_id: int, account_update: AccountUpdateModel) -> None:
@@ -82,6 +117,7 @@ async def update_account(user_id: int, account_update: AccountUpdateModel) -> No
         update_dict = {"user_id": user_id, **account_update.model_dump()}
 
         await acc_db.update([update_dict])
+        acc_db.on_commit(partial(bump_generation, user_id))
 
 
 class SupportedEncodings(StrEnum):
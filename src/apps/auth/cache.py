@@ -0,0 +1,32 @@
+from apps.auth.db.models import User
+from apps.auth.schemas import UserSnapshotModel
+from core.cache import RecentKeys, TTLCache
+from core.settings import settings
+
+user_cache = TTLCache(
+    maxsize=settings.auth.user_cache_size,
+    ttl=settings.auth.user_cache_ttl,
+)
+
+# A replica read right after a write could cache the old row again,
+# so the user is read from the primary until replicas catch up
+_recent_writes = RecentKeys(ttl=settings.db.replica_lag_window)
+
+
+def get_cached_user(username: str) -> UserSnapshotModel | None:
+    return user_cache.get(username)
+
+
+def cache_user(user: User) -> UserSnapshotModel:
+    snapshot = UserSnapshotModel.model_validate(user)
+    user_cache.set(snapshot.username, snapshot)
+    return snapshot
+
+
+def invalidate_user(username: str) -> None:
+    user_cache.pop(username)
+    _recent_writes.add(username)
+
+
+def can_read_replica(username: str) -> bool:
+    return username not in _recent_writes
@@ -7,14 +7,31 @@ from database.mixins import CRUDMixin
 class UserDatabase(CRUDMixin):
     __table__ = User
 
-    async def get(self, where: list | tuple) -> User | None:
+    async def get(
+        self,
+        where: list | tuple,
+        populate_existing: bool = False,
+    ) -> User | None:
+        """
+        :param populate_existing: overwrite a user already in the session with the
+            row, needed to read it back after a Core `UPDATE`
+        """
         stmt = select(User).where(*where).limit(1)
-        result = await self.async_session.scalar(stmt)
-        await self.async_session.commit()
-        return result
 
-    async def get_by_id(self, user_id: int) -> User | None:
-        return await self.get(where=(User.id == user_id,))
+        if populate_existing:
+            stmt = stmt.execution_options(populate_existing=True)
+
+        return await self.async_session.scalar(stmt)
+
+    async def get_by_id(
+        self,
+        user_id: int,
+        populate_existing: bool = False,
+    ) -> User | None:
+        return await self.get(
+            where=(User.id == user_id,),
+            populate_existing=populate_existing,
+        )
 
     async def get_by_username(self, username: str) -> User | None:
         return await self.get(where=(User.username == username,))
@@ -1,3 +1,4 @@
+from functools import partial
 from re import match
 from string import ascii_lowercase, ascii_uppercase, digits, punctuation
 
@@ -5,13 +6,22 @@ from bcrypt import checkpw, gensalt, hashpw
 from fastapi import status
 from sqlalchemy import or_
 
+from apps.auth.cache import invalidate_user
 from apps.auth.db.models import User
 from apps.auth.db.orm import UserDatabase
 from apps.auth.db.utils import get_user_db
-from apps.auth.schemas import UserCreateModel, UserLoginModel
+from apps.auth.schemas import UserCreateModel, UserLoginModel, UserUpdateModel
+from core.executors import BoundedExecutor
 from core.settings import settings
 from exceptions import AuthenticationError, ValidationError
 
+password_executor = BoundedExecutor(
+    max_workers=settings.auth.password_hash_workers,
+    max_queue_size=settings.auth.password_hash_queue_size,
+    thread_name_prefix="password-hash",
+    metrics_name="password_hash",
+)
+
 
 class PasswordHelper:
     password_min_length = settings.auth.password_min_length
@@ -66,17 +76,19 @@ class PasswordHelper:
             locations=["password"],
         )
 
-    def hash(self, password: str) -> bytes:
-        return hashpw(
+    async def hash(self, password: str) -> bytes:
+        return await password_executor.run(
+            hashpw,
             password=password.encode(encoding=settings.base_encoding),
             salt=gensalt(),
         )
 
-    def validate(self, password: str, hashed_password: bytes) -> bool:
+    async def validate(self, password: str, hashed_password: bytes) -> bool:
         if not password:
             return False
 
-        return checkpw(
+        return await password_executor.run(
+            checkpw,
             password=password.encode(encoding=settings.base_encoding),
             hashed_password=hashed_password,
         )
@@ -88,16 +100,20 @@ class UserManager:
     # def __init__(self) -> None:
     #     self.
 
-    async def get_by_id(self, user_id: int) -> User | None:
-        async with get_user_db() as user_db:  # type: UserDatabase
+    async def get_by_id(self, user_id: int, readonly: bool = True) -> User | None:
+        async with get_user_db(readonly=readonly) as user_db:  # type: UserDatabase
             return await user_db.get_by_id(user_id)
 
-    async def get_by_username(self, username: str) -> User | None:
-        async with get_user_db() as user_db:  # type: UserDatabase
+    async def get_by_username(
+        self,
+        username: str,
+        readonly: bool = True,
+    ) -> User | None:
+        async with get_user_db(readonly=readonly) as user_db:  # type: UserDatabase
             return await user_db.get_by_username(username)
 
-    async def get_by_email(self, user_email: str) -> User | None:
-        async with get_user_db() as user_db:  # type: UserDatabase
+    async def get_by_email(self, user_email: str, readonly: bool = True) -> User | None:
+        async with get_user_db(readonly=readonly) as user_db:  # type: UserDatabase
             return await user_db.get_by_email(user_email)
 
     async def validate_username(self, user_create: UserCreateModel) -> None:
@@ -106,7 +122,7 @@ class UserManager:
         if not match(username_pattern, user_create.username):
             raise ValidationError("Неверный формат логина", locations=["username"])
 
-        if await self.get_by_username(user_create.username) is not None:
+        if await self.get_by_username(user_create.username, readonly=False) is not None:
             raise ValidationError(
                 "Пользователь с таким логином уже существует",
                 locations=["username"],
@@ -123,7 +139,7 @@ class UserManager:
             if not match(email_pattern, user_create.email):
                 raise ValidationError("Неверный формат почты", locations=["email"])
 
-            if await self.get_by_email(user_create.email) is not None:
+            if await self.get_by_email(user_create.email, readonly=False) is not None:
                 raise ValidationError(
                     "Почта уже используется",
                     locations=["email"],
@@ -151,18 +167,39 @@ class UserManager:
             )
 
         password = user_dict.pop("password")
-        user_dict["hashed_password"] = self.password_helper.hash(password)
+        user_dict["hashed_password"] = await self.password_helper.hash(password)
 
         async with get_user_db() as user_db:  # type: UserDatabase
             created_user = (await user_db.create([user_dict]))[0]
+            user_db.on_commit(partial(invalidate_user, created_user.username))
 
         await self.on_after_register(created_user)
 
         return created_user
 
+    async def update(self, user: User, user_update: UserUpdateModel) -> User:
+        update_dict = user_update.model_dump(exclude_unset=True)
+
+        if "password" in update_dict:
+            update_dict["hashed_password"] = await self.password_helper.hash(
+                update_dict.pop("password"),
+            )
+
+        async with get_user_db() as user_db:  # type: UserDatabase
+            await user_db.update([{"id": user.id, **update_dict}])
+            updated_user = await user_db.get_by_id(user.id, populate_existing=True)
+            user_db.on_commit(partial(invalidate_user, updated_user.username))
+
+        await self.on_after_update(updated_user)
+
+        return updated_user
+
+    async def deactivate(self, user: User) -> User:
+        return await self.update(user, UserUpdateModel(is_active=False))
+
     @classmethod
     async def validate_auth_user(cls, user_login: UserLoginModel) -> User:
-        async with get_user_db() as user_db:  # type: UserDatabase
+        async with get_user_db(readonly=True) as user_db:  # type: UserDatabase
             where = [
                 or_(
                     User.username == user_login.username,
@@ -177,7 +214,10 @@ class UserManager:
                 "Неверный логин или пароль", locations=["username", "password"]
             )
 
-        if not cls.password_helper.validate(user_login.password, user.hashed_password):
+        if not await cls.password_helper.validate(
+            user_login.password,
+            user.hashed_password,
+        ):
             raise ValidationError(
                 "Неверный логин или пароль", locations=["username", "password"]
             )
@@ -1,36 +1,82 @@
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from apps.auth.cache import cache_user, can_read_replica, get_cached_user
 from apps.auth.db.utils import get_user_db
+from apps.auth.schemas import UserSnapshotModel
 from apps.auth.utils import decode_jwt
 from core.settings import settings
 
 
-class AuthJWTCookieMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
-        access_key: str | None = request.cookies.get(settings.auth.cookie_key)
+class LazyUser:
+    """
+    `request.user` proxy, JWT decode and user lookup run on the first `await resolve()`
+    """
 
-        if not access_key:
-            request.scope["user"] = None
+    __slots__ = ("_scope", "_user", "_resolved")
+
+    def __init__(self, scope: Scope) -> None:
+        self._scope = scope
+        self._user: UserSnapshotModel | None = None
+        self._resolved = False
+
+    @property
+    def is_resolved(self) -> bool:
+        return self._resolved
 
-            return await call_next(request)
+    async def resolve(self) -> UserSnapshotModel | None:
+        if not self._resolved:
+            self._user = await self.__load_user()
+            self._resolved = True
 
-        payload = decode_jwt(access_key)
-        username = payload.get("sub")
+        return self._user
+
+    async def __load_user(self) -> UserSnapshotModel | None:
+        access_key = HTTPConnection(self._scope).cookies.get(settings.auth.cookie_key)
+
+        if not access_key:
+            return None
+
+        username = decode_jwt(access_key).get("sub")
 
         if not username:
-            request.scope["user"] = None
+            return None
+
+        user = get_cached_user(username)
+
+        if user is None:
+            async with get_user_db(readonly=can_read_replica(username)) as user_db:
+                db_user = await user_db.get_by_username(username)
+
+            user = cache_user(db_user) if db_user else None
+
+        return user
+
+    def __get_user(self) -> UserSnapshotModel | None:
+        if not self._resolved:
+            raise RuntimeError(f"{self!r} is accessed before `resolve()`")
+
+        return self._user
+
+    def __bool__(self) -> bool:
+        return self.__get_user() is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self.__get_user(), name)
+
+    def __repr__(self) -> str:
+        if self._resolved:
+            return repr(self._user)
+
+        return f"{self.__class__.__name__}(unresolved)"
 
-            return await call_next(request)
 
-        async with get_user_db() as user_db:
-            user = await user_db.get_by_username(username)
+class AuthJWTCookieMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-            request.scope["user"] = user
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            scope["user"] = LazyUser(scope)
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -7,7 +7,7 @@ from starlette.templating import _TemplateResponse
 from apps.auth.db.models import User
 from apps.auth.managers import UserManager
 from apps.auth.schemas import UserCheckModel, UserCheckStatusModel, UserCreateModel
-from apps.auth.utils import create_home_logged_redirect, login_require
+from apps.auth.utils import create_home_logged_redirect, resolve_user
 from core.ctx_proc import render_template
 from core.settings import settings
 from exceptions import AuthenticationError, ValidationError
@@ -23,6 +23,7 @@ cookie = APIKeyCookie(name=settings.auth.cookie_key, auto_error=False)
     path=settings.register_url,
     response_class=HTMLResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(resolve_user)],
 )
 async def register_form(request: Request) -> _TemplateResponse:
     if request.user:
@@ -43,6 +44,7 @@ async def register_form(request: Request) -> _TemplateResponse:
     path=settings.register_url,
     status_code=status.HTTP_302_FOUND,
     response_class=RedirectResponse,
+    dependencies=[Depends(resolve_user)],
 )
 async def register(request: Request, user: UserCreateModel):
     if request.user:
@@ -62,6 +64,7 @@ async def register(request: Request, user: UserCreateModel):
     path=settings.login_url,
     response_class=HTMLResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(resolve_user)],
 )
 async def login_form(request: Request):
     if not request.user:
@@ -74,6 +77,7 @@ async def login_form(request: Request):
     path=settings.login_url,
     status_code=status.HTTP_302_FOUND,
     response_class=RedirectResponse,
+    dependencies=[Depends(resolve_user)],
 )
 async def login(
     request: Request,
@@ -93,6 +97,7 @@ async def login(
     path=settings.logout_url,
     status_code=status.HTTP_302_FOUND,
     response_class=RedirectResponse,
+    dependencies=[Depends(resolve_user)],
 )
 async def logout(request: Request):
     if not request.user:
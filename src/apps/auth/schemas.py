@@ -13,6 +13,17 @@ class UserReadModel(BaseModel):
     is_verified: bool | None = None
 
 
+class UserSnapshotModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    username: str
+    email: str | None = None
+    is_active: bool
+    is_superuser: bool
+    is_verified: bool
+
+
 class UserCreateModel(BaseModel):
     username: str
     password: str
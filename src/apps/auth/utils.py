@@ -1,5 +1,15 @@
 from datetime import UTC, datetime, timedelta
+from hashlib import sha256
+from time import time
 
+from cryptography.hazmat.primitives.asymmetric.types import (
+    PrivateKeyTypes,
+    PublicKeyTypes,
+)
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
 from jwt import (
     decode,
     encode,
@@ -10,12 +20,30 @@ from starlette.requests import Request
 from starlette.responses import RedirectResponse
 
 from apps.auth.db.models import User
+from apps.auth.schemas import UserSnapshotModel
+from core.cache import TTLCache
 from core.settings import settings
 from exceptions import AuthenticationError
 
+# Parsed once, PyJWT accepts key objects and skips PEM parsing on every call
+PRIVATE_KEY: PrivateKeyTypes = load_pem_private_key(
+    settings.auth.private_key.read_bytes(),
+    password=None,
+)
+PUBLIC_KEY: PublicKeyTypes = load_pem_public_key(settings.auth.public_key.read_bytes())
+
+verified_tokens_cache = TTLCache(
+    maxsize=settings.auth.token_cache_size,
+    ttl=settings.auth.access_token_age,
+)
+
+
+async def resolve_user(request: Request) -> UserSnapshotModel | None:
+    return await request.user.resolve()
 
-def login_require(request: Request) -> None:
-    if not request.user:
+
+async def login_require(request: Request) -> None:
+    if not await resolve_user(request):
         raise AuthenticationError()
 
 
@@ -47,9 +75,7 @@ def create_home_logged_redirect(
 # ========================================|JWT|========================================= #
 def encode_jwt(
     payload: dict,
-    private_key: str = settings.auth.private_key.read_text(
-        encoding=settings.base_encoding,
-    ),
+    private_key: PrivateKeyTypes | str = PRIVATE_KEY,
     algorithm: str = settings.auth.jwt_algorithm,
     token_age: int = settings.auth.access_token_age,
 ) -> str:
@@ -63,13 +89,35 @@ def encode_jwt(
 
 def decode_jwt(
     jwt: bytes | str,
-    public_key: str = settings.auth.public_key.read_text(encoding=settings.base_encoding),
+    public_key: PublicKeyTypes | str = PUBLIC_KEY,
     algorithm: str = settings.auth.jwt_algorithm,
 ) -> dict:
+    """
+    Claims of tokens verified with the default key are cached until the token `exp`
+    :return: claims or empty dict for invalid token
+    """
+    use_cache = public_key is PUBLIC_KEY
+
+    if use_cache:
+        token = jwt if isinstance(jwt, bytes) else jwt.encode()
+        token_digest = sha256(token).digest()
+
+        payload = verified_tokens_cache.get((token_digest, algorithm))
+
+        if payload is not None:
+            return payload.copy()
+
     try:
         payload = decode(jwt=jwt, key=public_key, algorithms=[algorithm])
 
     except PyJWTError:
         return {}
 
+    if use_cache and "exp" in payload:
+        verified_tokens_cache.set(
+            (token_digest, algorithm),
+            payload.copy(),
+            ttl=payload["exp"] - time(),
+        )
+
     return payload
@@ -0,0 +1,3 @@
+from .router import router as metrics_router
+
+__all__ = ("metrics_router",)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import registry
+from core.settings import settings
+
+app_name = "metrics"
+router = APIRouter()
+
+
+@router.get(settings.metrics.url, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,115 @@
+"""
+Before/after latency of the authentication middleware on `home` and `/check`.
+`before` is the eager BaseHTTPMiddleware flavour, `after` is the pure ASGI one
+
+    cd src && python -m benchmarks.auth_middleware [requests]
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.utils import measure, migrate, prepare_environment
+
+USERNAME = "benchmark"
+PASSWORD = "Benchmark-1"
+
+
+def create_app(auth_middleware: type):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from core.routers import register_routers
+    from core.settings import settings
+    from exceptions.handlers import register_exc_handlers
+
+    app = FastAPI(openapi_url=None, docs_url=None, redoc_url=None)
+
+    app.add_middleware(CORSMiddleware, allow_origins=settings.origins)  # type: ignore
+    app.add_middleware(auth_middleware)  # type: ignore
+
+    register_routers(app)
+    register_exc_handlers(app)
+
+    return app
+
+
+def create_eager_middleware() -> type:
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    from apps.auth.middlewares import LazyUser
+
+    class EagerAuthJWTCookieMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            user = LazyUser(request.scope)
+            await user.resolve()
+
+            request.scope["user"] = user
+
+            return await call_next(request)
+
+    return EagerAuthJWTCookieMiddleware
+
+
+async def run(count: int) -> None:
+    from httpx import ASGITransport, AsyncClient
+
+    from apps.auth.managers import UserManager
+    from apps.auth.middlewares import AuthJWTCookieMiddleware
+    from apps.auth.schemas import UserCreateModel
+    from apps.auth.utils import encode_jwt
+    from core.settings import settings
+    from database.utils import db
+
+    await db.init(settings.db.url)
+
+    await UserManager().create(
+        UserCreateModel(username=USERNAME, password=PASSWORD, password_check=PASSWORD),
+    )
+    cookies = {settings.auth.cookie_key: encode_jwt({"sub": USERNAME})}
+
+    variants = {
+        "before": create_app(create_eager_middleware()),
+        "after": create_app(AuthJWTCookieMiddleware),
+    }
+
+    try:
+        for variant, app in variants.items():
+            async with AsyncClient(
+                transport=ASGITransport(app=app),
+                base_url="http://benchmark",
+                cookies=cookies,
+            ) as client:
+                results = [
+                    await measure(
+                        f"{variant} GET {settings.home_url}",
+                        lambda: client.get(settings.home_url),
+                        count,
+                    ),
+                    await measure(
+                        f"{variant} POST /check",
+                        lambda: client.post("/check", json={"username": USERNAME}),
+                        count,
+                    ),
+                ]
+
+            for result in results:
+                print(result)
+
+    finally:
+        await db.close()
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+
+    with TemporaryDirectory() as temp_dir:
+        prepare_environment(Path(temp_dir) / "benchmark.db")
+        migrate()
+
+        asyncio.run(run(count))
+
+
+if __name__ == "__main__":
+    main()
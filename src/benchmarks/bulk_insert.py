@@ -0,0 +1,86 @@
+"""
+ORM `CRUDMixin.create` against Core `CRUDMixin.bulk_create` for account import
+
+    cd src && python -m benchmarks.bulk_insert [rows]
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from benchmarks.utils import migrate, prepare_environment
+
+
+def make_accounts(user_id: int, rows: int) -> list[dict]:
+    return [
+        {
+            "user_id": user_id,
+            "name": f"account-{idx}",
+            "data": {"login": f"login-{idx}", "password": f"password-{idx}"},
+        }
+        for idx in range(rows)
+    ]
+
+
+async def run(rows: int) -> None:
+    from sqlalchemy import insert
+
+    from apps.accounts.db.utils import get_acc_db
+    from apps.auth.db.models import User
+    from core.settings import settings
+    from database.utils import db, get_async_session
+
+    await db.init(settings.db.url)
+
+    try:
+        async with get_async_session() as async_session:
+            user_ids = (
+                await async_session.scalars(
+                    insert(User).returning(User.id),
+                    [
+                        {"username": f"user-{idx}", "hashed_password": "-"}
+                        for idx in range(3)
+                    ],
+                )
+            ).all()
+            await async_session.commit()
+
+        variants = {
+            "orm create": lambda acc_db, accounts: acc_db.create(accounts),
+            "core bulk_create": lambda acc_db, accounts: acc_db.bulk_create(accounts),
+            "core bulk_create returning": lambda acc_db, accounts: acc_db.bulk_create(
+                accounts,
+                returning=True,
+            ),
+        }
+
+        for user_id, (name, create) in zip(user_ids, variants.items()):
+            accounts = make_accounts(user_id, rows)
+
+            async with get_acc_db() as acc_db:
+                started_at = perf_counter()
+                await create(acc_db, accounts)
+                total = perf_counter() - started_at
+
+            print(
+                f"{name:<28} rows={rows:<8} {total:>8.3f}s {rows / total:>10.0f} rows/s"
+            )
+
+    finally:
+        await db.close()
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    with TemporaryDirectory() as temp_dir:
+        prepare_environment(Path(temp_dir) / "benchmark.db")
+        migrate()
+
+        asyncio.run(run(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+`EXPLAIN QUERY PLAN` of the statements `AccountDatabase` actually sends (SQLite).
+Fails when `account` is scanned instead of searched through an index,
+when the full-text match is probed per account row,
+when a `field=value` search does not seek the data field index,
+or when an ordered load sorts in a temp b-tree
+
+    cd src && python -m benchmarks.explain_indexes
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from re import search
+from tempfile import TemporaryDirectory
+from typing import Awaitable, Callable
+
+from benchmarks.seed import WORDS, seed
+from benchmarks.utils import migrate, prepare_environment
+
+USERS = 5
+ACCOUNTS = 5_000
+
+ACCOUNT_INDEX_PATTERN = (
+    r"^SEARCH account USING (COVERING )?INDEX ix__account__user_id"
+    r"|^SEARCH account USING INTEGER PRIMARY KEY"
+)
+FIELD_INDEX_PATTERN = (
+    r"^SEARCH account USING INDEX ix__account__user_id__data_login__status__name"
+    r" \(user_id=\? AND <expr>=\?"
+)
+FULL_SCAN_PATTERN = r"^SCAN account\b"
+# `rowid=` constraint on the FTS table: MATCH is evaluated once per account row
+FTS_PROBE_PATTERN = r"account_fts VIRTUAL TABLE INDEX \d+:="
+SORT_PATTERN = r"USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY"
+
+
+async def capture_statements(
+    call: Callable[[], Awaitable],
+) -> list[tuple[str, tuple | dict]]:
+    from sqlalchemy import event
+
+    from database.utils import db
+
+    sync_engine = db._async_engine.sync_engine
+    statements = []
+
+    def before_cursor_execute(
+        connection, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    try:
+        await call()
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    return statements
+
+
+async def explain(statement: str, parameters: tuple | dict) -> list[str]:
+    from database.utils import db
+
+    async with db.connect() as connection:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}",
+            parameters,
+        )
+        return [row[-1] for row in result.all()]
+
+
+def check_plan(
+    plan: list[str],
+    ordered: bool,
+    index_pattern: str = ACCOUNT_INDEX_PATTERN,
+) -> list[str]:
+    """
+    :return: problems found in the plan
+    """
+    problems = []
+
+    if not any(search(index_pattern, detail) for detail in plan):
+        problems.append(f"account is not searched through an index: {index_pattern}")
+
+    problems.extend(
+        f"full scan: {detail}" for detail in plan if search(FULL_SCAN_PATTERN, detail)
+    )
+    problems.extend(
+        f"full-text probe per row: {detail}"
+        for detail in plan
+        if search(FTS_PROBE_PATTERN, detail)
+    )
+
+    if ordered:
+        problems.extend(
+            f"sort: {detail}" for detail in plan if search(SORT_PATTERN, detail)
+        )
+
+    return problems
+
+
+async def run() -> bool:
+    from apps.accounts.db.models import Account
+    from apps.accounts.db.utils import get_acc_db
+    from core.settings import settings
+    from database.utils import db
+
+    await db.init(settings.db.url)
+
+    try:
+        seed_result = await seed(users=USERS, rows=ACCOUNTS)
+        user_id = seed_result.user_id
+
+        async def search_by_id() -> None:
+            async with get_acc_db() as acc_db:
+                result = await acc_db.search_by_id(
+                    user_id=user_id,
+                    accounts_ids=list(range(1, 100, 7)),
+                    limit=50,
+                )
+                result.data.all()
+
+        async def search_by_name_fulltext() -> None:
+            async with get_acc_db() as acc_db:
+                result = await acc_db.search_by_name_or_details(
+                    user_id=user_id,
+                    name=WORDS[0],
+                    limit=50,
+                    order_by=Account.name,
+                    keyset=True,
+                )
+                result.data.all()
+
+        async def search_by_name_exact() -> None:
+            async with get_acc_db() as acc_db:
+                result = await acc_db.search_by_name_or_details(
+                    user_id=user_id,
+                    name=WORDS[0],
+                    exact_match=True,
+                    limit=50,
+                    order_by=Account.name,
+                )
+                result.data.all()
+
+        async def search_by_field() -> None:
+            async with get_acc_db() as acc_db:
+                result = await acc_db.search_by_name_or_details(
+                    user_id=user_id,
+                    name=f"login={WORDS[0]}.user0@example.com",
+                    limit=50,
+                    order_by=Account.name,
+                    keyset=True,
+                )
+                assert len(result.data.all()) == 1
+
+        async def search_page_by_name() -> None:
+            async with get_acc_db() as acc_db:
+                result = await acc_db.search_by_name_or_details(
+                    user_id=user_id,
+                    limit=50,
+                    order_by=Account.name,
+                    keyset=True,
+                )
+                result.data.all()
+
+        async def load_ordered_by_name() -> None:
+            async with get_acc_db() as acc_db:
+                async for _ in acc_db.stream_by_id(
+                    user_id=user_id,
+                    order_by=Account.name,
+                ):
+                    pass
+
+        # Full-text matches are ranked, so only the account lookup is checked
+        cases = (
+            ("search_by_id", search_by_id, False, ACCOUNT_INDEX_PATTERN),
+            (
+                "search_by_name_or_details fulltext",
+                search_by_name_fulltext,
+                False,
+                ACCOUNT_INDEX_PATTERN,
+            ),
+            (
+                "search_by_name_or_details field",
+                search_by_field,
+                True,
+                FIELD_INDEX_PATTERN,
+            ),
+            (
+                "search_by_name_or_details exact",
+                search_by_name_exact,
+                True,
+                ACCOUNT_INDEX_PATTERN,
+            ),
+            (
+                "search_by_name_or_details keyset page",
+                search_page_by_name,
+                True,
+                ACCOUNT_INDEX_PATTERN,
+            ),
+            (
+                "stream_by_id order by name",
+                load_ordered_by_name,
+                True,
+                ACCOUNT_INDEX_PATTERN,
+            ),
+        )
+
+        passed = True
+
+        for name, call, ordered, index_pattern in cases:
+            for statement, parameters in await capture_statements(call):
+                plan = await explain(statement, parameters)
+                problems = check_plan(plan, ordered, index_pattern)
+                passed = passed and not problems
+
+                print(f"{'FAIL' if problems else 'OK'}    {name}")
+
+                for detail in plan:
+                    print(f"        {detail}")
+
+                for problem in problems:
+                    print(f"      ! {problem}")
+
+        return passed
+
+    finally:
+        await db.close()
+
+
+def main() -> None:
+    with TemporaryDirectory() as temp_dir:
+        prepare_environment(Path(temp_dir) / "explain.db")
+        migrate()
+
+        if not asyncio.run(run()):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+`logger.warning` latency on the calling thread during an error storm: the rotating file
+handler called inline against the same handler behind `BoundedQueueHandler`
+
+    cd src && python -m benchmarks.logging_queue [records]
+"""
+
+import sys
+from logging import WARNING, Formatter, Handler, getLogger
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from benchmarks.utils import build_measurement
+
+MAX_BYTES = 1_048_576
+BACKUP_COUNT = 5
+MESSAGE = "URL:=`%s`, user=`%s`, exception=`%s`"
+
+
+def make_file_handler(log_path: Path) -> Handler:
+    handler = RotatingFileHandler(
+        log_path,
+        maxBytes=MAX_BYTES,
+        backupCount=BACKUP_COUNT,
+        encoding="UTF-8",
+    )
+    handler.setFormatter(
+        Formatter(
+            "%(levelname)s | %(name)s | %(asctime)s | %(lineno)s | <%(message)s>",
+        ),
+    )
+    return handler
+
+
+def run(name: str, records: int) -> None:
+    logger = getLogger("benchmarks")
+    timings = []
+
+    started_at = perf_counter()
+
+    for record_idx in range(records):
+        call_started_at = perf_counter()
+        logger.warning(
+            MESSAGE,
+            f"https://localhost/accounts/{record_idx}",
+            "benchmark",
+            {"error_type": "NotFoundError", "error_message": "Аккаунт не найден"},
+        )
+        timings.append(perf_counter() - call_started_at)
+
+    print(build_measurement(name, timings, perf_counter() - started_at))
+
+
+def main() -> None:
+    from log.handlers import DropPolicy, start_queue_logging, stop_queue_logging
+
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    root = getLogger()
+    root.setLevel(WARNING)
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    with TemporaryDirectory() as temp_dir:
+        file_handler = make_file_handler(Path(temp_dir) / "sync.log")
+        root.addHandler(file_handler)
+
+        run("sync", records)
+
+        root.removeHandler(file_handler)
+        file_handler.close()
+
+        for drop_policy in DropPolicy:
+            root.addHandler(make_file_handler(Path(temp_dir) / f"{drop_policy}.log"))
+            queue_handler = start_queue_logging(
+                queue_size=10_000, drop_policy=drop_policy
+            )
+
+            run(f"queue {drop_policy}", records)
+
+            stop_queue_logging()
+            print(f"queue {drop_policy} dropped={queue_handler.dropped}")
+
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+                handler.close()
+
+
+if __name__ == "__main__":
+    main()
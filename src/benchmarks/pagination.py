@@ -0,0 +1,75 @@
+"""
+Offset pages with `count(*)` (`with_total=True`) against the `limit + 1` lookahead,
+and keyset pages for reference, on one user's accounts
+
+    cd src && python -m benchmarks.pagination [rows] [queries]
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.seed import seed
+from benchmarks.utils import measure, migrate, prepare_environment
+
+PAGES = (1, 50)
+LIMIT = 50
+
+
+async def run(rows: int, count: int) -> None:
+    from apps.accounts.db.models import Account
+    from apps.accounts.db.utils import get_acc_db
+    from core.settings import settings
+    from database.utils import db
+
+    await db.init(settings.db.url, sqlite_pragmas=settings.db.sqlite.pragmas)
+
+    try:
+        user_id = (await seed(users=1, rows=rows)).user_id
+
+        for page in PAGES:
+            for name, with_total in (("count", True), ("lookahead", False)):
+
+                async def offset_page() -> None:
+                    async with get_acc_db() as acc_db:
+                        result = await acc_db.search_by_id(
+                            user_id=user_id,
+                            page=page,
+                            limit=LIMIT,
+                            order_by=Account.name,
+                            with_total=with_total,
+                        )
+                        result.data.all()
+
+                print(await measure(f"offset page={page} {name}", offset_page, count))
+
+        async def keyset_page() -> None:
+            async with get_acc_db() as acc_db:
+                result = await acc_db.search_by_id(
+                    user_id=user_id,
+                    limit=LIMIT,
+                    order_by=Account.name,
+                    keyset=True,
+                )
+                result.data.all()
+
+        print(await measure("keyset first page", keyset_page, count))
+
+    finally:
+        await db.close()
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with TemporaryDirectory() as temp_dir:
+        prepare_environment(Path(temp_dir) / "pagination.db")
+        migrate()
+
+        asyncio.run(run(rows, count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+asyncpg prepared statement caching (`direct`) against no caching
+(`pgbouncer_transaction`) for `get_by_username` and account search. Needs the PostgreSQL
+database from `APP.DB.*` with migrations applied, temporary rows are removed afterwards
+
+    cd src && python -m benchmarks.pg_statement_cache [queries]
+"""
+
+import asyncio
+import sys
+from uuid import uuid4
+
+from benchmarks.seed import WORDS, iter_accounts
+from benchmarks.utils import measure
+
+ACCOUNTS = 10_000
+
+
+async def seed_user(username: str) -> int:
+    from sqlalchemy import insert
+
+    from apps.accounts.db.utils import get_acc_db
+    from apps.auth.db.models import User
+    from database.utils import get_async_session
+
+    async with get_async_session() as async_session:
+        user_id = await async_session.scalar(
+            insert(User)
+            .values(username=username, hashed_password="-")
+            .returning(User.id),
+        )
+        await async_session.commit()
+
+    async with get_acc_db() as acc_db:
+        await acc_db.bulk_create(iter_accounts([user_id], ACCOUNTS))
+
+    return user_id
+
+
+async def cleanup(user_id: int) -> None:
+    from sqlalchemy import delete
+
+    from apps.accounts.db.models import Account
+    from apps.auth.db.models import User
+    from database.utils import get_async_session
+
+    async with get_async_session() as async_session:
+        await async_session.execute(delete(Account).where(Account.user_id == user_id))
+        await async_session.execute(delete(User).where(User.id == user_id))
+        await async_session.commit()
+
+
+async def run(count: int) -> None:
+    from apps.accounts.db.models import Account
+    from apps.accounts.db.utils import get_acc_db
+    from apps.auth.db.utils import get_user_db
+    from core.settings import PGConnectionMode, settings
+    from database.utils import db
+
+    if "postgresql" not in settings.db.drivername:
+        sys.exit("APP.DB.DRIVERNAME must be a PostgreSQL driver")
+
+    username = f"benchmark-{uuid4()}"
+
+    await db.init(settings.db.url)
+
+    try:
+        user_id = await seed_user(username)
+    finally:
+        await db.close()
+
+    async def get_by_username() -> None:
+        async with get_user_db() as user_db:
+            await user_db.get_by_username(username)
+
+    async def search_page() -> None:
+        async with get_acc_db() as acc_db:
+            result = await acc_db.search_by_name_or_details(
+                user_id=user_id,
+                name=WORDS[0],
+                limit=settings.accounts.search_page_size,
+                order_by=Account.name,
+                keyset=True,
+            )
+            result.data.all()
+
+    async def search_by_id() -> None:
+        async with get_acc_db() as acc_db:
+            result = await acc_db.search_by_id(user_id=user_id, limit=100, keyset=True)
+            result.data.all()
+
+    try:
+        for mode in (PGConnectionMode.pgbouncer_transaction, PGConnectionMode.direct):
+            await db.init(
+                settings.db.url,
+                max_overflow=settings.db.max_overflow,
+                pool_size=settings.db.pool_size,
+                pg_connection_mode=mode,
+                statement_cache_size=settings.db.statement_cache_size,
+                prepared_statement_cache_size=settings.db.prepared_statement_cache_size,
+            )
+
+            try:
+                for name, call in (
+                    ("get_by_username", get_by_username),
+                    ("search_by_name_or_details", search_page),
+                    ("search_by_id", search_by_id),
+                ):
+                    print(await measure(f"{mode} {name}", call, count))
+
+            finally:
+                await db.close()
+
+    finally:
+        await db.init(settings.db.url)
+        await cleanup(user_id)
+        await db.close()
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    asyncio.run(run(count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Synthetic users and accounts for benchmarks.
+Account names are `<word>-<idx>`, so searching one of `WORDS` matches ~1/len(WORDS) rows
+"""
+
+from itertools import cycle, islice
+from typing import Iterator
+
+from pydantic import BaseModel
+
+WORDS = (
+    "mail", "bank", "forum", "cloud", "shop", "game", "work",
+    "home", "music", "video", "news", "chat", "wiki", "blog",
+    "photo", "maps", "drive", "notes", "travel", "sport",
+)  # fmt: skip
+
+BENCHMARK_USERNAME = "benchmark"
+BENCHMARK_PASSWORD = "Benchmark-1"
+
+
+class SeedResult(BaseModel):
+    users: int
+    accounts: int
+    user_id: int
+
+
+def iter_accounts(user_ids: list[int], rows: int) -> Iterator[dict]:
+    """
+    Accounts are spread round-robin between users
+    :return: Iterator of account dicts
+    """
+    for idx, user_id in enumerate(islice(cycle(user_ids), rows)):
+        word = WORDS[idx % len(WORDS)]
+
+        yield {
+            "user_id": user_id,
+            "name": f"{word}-{idx}",
+            "data": {
+                "login": f"{word}.user{idx}@example.com",
+                "password": f"password-{idx}",
+            },
+        }
+
+
+async def seed(users: int, rows: int, batch_size: int = 10_000) -> SeedResult:
+    """
+    The first user is created through `UserManager` and can log in
+    with `BENCHMARK_PASSWORD`, the others share its password hash
+    :return: SeedResult
+    """
+    from sqlalchemy import insert
+
+    from apps.accounts.db.utils import get_acc_db
+    from apps.auth.db.models import User
+    from apps.auth.managers import UserManager
+    from apps.auth.schemas import UserCreateModel
+    from database.utils import get_async_session
+
+    user = await UserManager().create(
+        UserCreateModel(
+            username=BENCHMARK_USERNAME,
+            password=BENCHMARK_PASSWORD,
+            password_check=BENCHMARK_PASSWORD,
+        ),
+    )
+    user_ids = [user.id]
+
+    if users > 1:
+        async with get_async_session() as async_session:
+            result = await async_session.scalars(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "username": f"{BENCHMARK_USERNAME}-{idx}",
+                        "hashed_password": user.hashed_password,
+                    }
+                    for idx in range(1, users)
+                ],
+            )
+            user_ids.extend(result.all())
+            await async_session.commit()
+
+    async with get_acc_db() as acc_db:
+        await acc_db.bulk_create(iter_accounts(user_ids, rows), batch_size=batch_size)
+
+    return SeedResult(users=len(user_ids), accounts=rows, user_id=user.id)
@@ -0,0 +1,144 @@
+"""
+SQLite defaults against the `settings.db.sqlite` profile (WAL, synchronous=NORMAL, ...)
+under concurrent readers and writers.
+Both runs start from a copy of the same seeded file
+
+    cd src && python -m benchmarks.sqlite_profile [operations per task]
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Awaitable, Callable
+
+from benchmarks.seed import WORDS, iter_accounts, seed
+from benchmarks.utils import build_measurement, migrate, prepare_environment
+
+ACCOUNTS = 20_000
+READERS = 8
+WRITERS = 4
+WRITE_BATCH = 10
+
+
+async def run_tasks(
+    call: Callable[[int], Awaitable],
+    tasks: int,
+    operations: int,
+) -> list[float]:
+    timings = []
+
+    async def task(task_idx: int) -> None:
+        for operation in range(operations):
+            started_at = perf_counter()
+            await call(task_idx * operations + operation)
+            timings.append(perf_counter() - started_at)
+
+    await asyncio.gather(*(task(task_idx) for task_idx in range(tasks)))
+
+    return timings
+
+
+async def run_profile(
+    name: str,
+    db_path: Path,
+    pragmas: dict,
+    user_id: int,
+    operations: int,
+) -> None:
+    from sqlalchemy import update
+
+    from apps.accounts.db.models import Account
+    from apps.accounts.db.utils import get_acc_db
+    from core.settings import settings
+    from database.utils import db
+
+    await db.init(
+        f"sqlite+aiosqlite:///{db_path.as_posix()}",
+        max_overflow=settings.db.max_overflow,
+        pool_size=settings.db.pool_size,
+        sqlite_pragmas=pragmas,
+    )
+
+    async def read(idx: int) -> None:
+        async with get_acc_db() as acc_db:
+            result = await acc_db.search_by_name_or_details(
+                user_id=user_id,
+                name=WORDS[idx % len(WORDS)],
+                limit=settings.accounts.search_page_size,
+                order_by=Account.name,
+                keyset=True,
+            )
+            result.data.all()
+
+    async def write(idx: int) -> None:
+        async with get_acc_db() as acc_db:
+            await acc_db.bulk_create(
+                iter_accounts([user_id], WRITE_BATCH),
+                commit=False,
+            )
+            await acc_db.async_session.execute(
+                update(Account)
+                .where(Account.id == idx % ACCOUNTS + 1)
+                .values(name=f"renamed-{idx}"),
+            )
+            await acc_db.async_session.commit()
+
+    try:
+        started_at = perf_counter()
+        read_timings, write_timings = await asyncio.gather(
+            run_tasks(read, READERS, operations),
+            run_tasks(write, WRITERS, operations),
+        )
+        total = perf_counter() - started_at
+
+        print(build_measurement(f"{name} read", read_timings, total))
+        print(build_measurement(f"{name} write", write_timings, total))
+
+    finally:
+        await db.close()
+
+
+async def prepare() -> int:
+    from core.settings import settings
+    from database.utils import db
+
+    await db.init(settings.db.url)
+
+    try:
+        seed_result = await seed(users=1, rows=ACCOUNTS)
+    finally:
+        await db.close()
+
+    return seed_result.user_id
+
+
+def main() -> None:
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    with TemporaryDirectory() as temp_dir:
+        seed_path = Path(temp_dir) / "seed.db"
+
+        prepare_environment(seed_path)
+        migrate()
+
+        from core.settings import SQLiteSettings
+
+        user_id = asyncio.run(prepare())
+
+        profiles = {
+            "default": {},
+            "tuned": SQLiteSettings().pragmas,
+        }
+
+        for name, pragmas in profiles.items():
+            db_path = Path(temp_dir) / f"{name}.db"
+            copyfile(seed_path, db_path)
+
+            asyncio.run(run_profile(name, db_path, pragmas, user_id, operations))
+
+
+if __name__ == "__main__":
+    main()
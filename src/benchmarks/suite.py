@@ -0,0 +1,240 @@
+"""
+Latency and throughput of the hot endpoints against `main:app` running in-process
+on a seeded SQLite database. Results can be saved as a JSON baseline
+(`benchmarks/baselines/<scale>.json`) and compared with it on later commits
+
+    cd src && python -m benchmarks.suite --scale 100k --save
+    cd src && python -m benchmarks.suite --scale 100k --compare
+
+`--db` keeps the seeded database between runs, seeding 1M rows takes a while
+"""
+
+import asyncio
+import sys
+from argparse import ArgumentParser, Namespace
+from itertools import count as counter
+from json import dumps
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Awaitable, Callable
+
+from httpx import Response
+
+from benchmarks.seed import BENCHMARK_PASSWORD, BENCHMARK_USERNAME, WORDS, seed
+from benchmarks.utils import (
+    Measurement,
+    compare_reports,
+    get_baseline_path,
+    load_report,
+    make_report,
+    measure,
+    migrate,
+    prepare_environment,
+    save_report,
+)
+
+SCALES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+
+async def get_user_accounts_ids(user_id: int, limit: int, latest: bool) -> list[int]:
+    from sqlalchemy import select
+
+    from apps.accounts.db.models import Account
+    from apps.accounts.schemas import AccountStatus
+    from database.utils import get_async_session
+
+    stmt = (
+        select(Account.id)
+        .where(Account.user_id == user_id, Account.status == AccountStatus.active)
+        .order_by(Account.id.desc() if latest else Account.id)
+        .limit(limit)
+    )
+
+    async with get_async_session() as async_session:
+        return list((await async_session.scalars(stmt)).all())
+
+
+async def get_benchmark_user_id() -> int:
+    from apps.auth.db.utils import get_user_db
+
+    async with get_user_db() as user_db:
+        user = await user_db.get_by_username(BENCHMARK_USERNAME)
+
+    return user.id
+
+
+def checked(
+    call: Callable[[], Awaitable[Response]],
+) -> Callable[[], Awaitable[Response]]:
+    """
+    Fails the run instead of timing error responses
+    """
+
+    async def wrapper() -> Response:
+        response = await call()
+
+        if response.is_error:
+            raise RuntimeError(
+                f"{response.request.url}: {response.status_code} {response.text}"
+            )
+
+        return response
+
+    return wrapper
+
+
+async def run_scenarios(args: Namespace) -> list[Measurement]:
+    from httpx import ASGITransport, AsyncClient
+
+    from apps.auth.utils import encode_jwt
+    from core.settings import settings
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        if args.seed:
+            await seed(args.users, args.rows)
+
+        user_id = await get_benchmark_user_id()
+        export_ids = await get_user_accounts_ids(
+            user_id,
+            args.export_size,
+            latest=False,
+        )
+        delete_ids = await get_user_accounts_ids(
+            user_id,
+            args.requests + args.warmup,
+            latest=True,
+        )
+
+        cookies = {settings.auth.cookie_key: encode_jwt({"sub": BENCHMARK_USERNAME})}
+        upload_file = dumps(
+            [
+                {"name": f"import-{idx}", "data": {"login": f"import{idx}"}}
+                for idx in range(args.import_size)
+            ]
+        ).encode()
+        search_words = counter()
+
+        transport = ASGITransport(app=app)
+
+        async with (
+            AsyncClient(transport=transport, base_url="http://benchmark") as anonymous,
+            AsyncClient(
+                transport=transport,
+                base_url="http://benchmark",
+                cookies=cookies,
+            ) as client,
+        ):
+
+            async def login() -> Response:
+                anonymous.cookies.clear()
+                return await anonymous.post(
+                    settings.login_url,
+                    json={
+                        "username": BENCHMARK_USERNAME,
+                        "password": BENCHMARK_PASSWORD,
+                    },
+                )
+
+            scenarios = {
+                "auth_middleware anonymous": lambda: anonymous.get(settings.home_url),
+                "auth_middleware authenticated": lambda: client.get(settings.home_url),
+                "login": login,
+                "accounts_search": lambda: client.post(
+                    settings.search_url,
+                    data={"search": WORDS[next(search_words) % len(WORDS)]},
+                ),
+                "accounts_export": lambda: client.post(
+                    "/accounts/export",
+                    json={"accounts_ids": export_ids, "export_type": "json"},
+                ),
+                "accounts_import": lambda: client.post(
+                    "/accounts/upload",
+                    files={"file": ("accounts.json", upload_file)},
+                ),
+                "accounts_delete": lambda: client.delete(
+                    f"/accounts/delete/{delete_ids.pop()}",
+                ),
+            }
+
+            results = []
+
+            for name, call in scenarios.items():
+                result = await measure(
+                    name,
+                    checked(call),
+                    args.requests,
+                    warmup=args.warmup,
+                )
+                results.append(result)
+                print(result)
+
+    return results
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--users", type=int, help="rows / 10 000 by default")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--export-size", type=int, default=1_000)
+    parser.add_argument("--import-size", type=int, default=100)
+    parser.add_argument("--db", type=Path, help="seeded database to create or reuse")
+    parser.add_argument("--save", action="store_true", help="overwrite the baseline")
+    parser.add_argument(
+        "--compare", action="store_true", help="compare with the baseline"
+    )
+    parser.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args()
+    args.rows = SCALES[args.scale]
+    args.users = args.users or max(1, args.rows // 10_000)
+
+    if args.rows // args.users < args.requests + args.warmup:
+        parser.error("not enough accounts per user for `accounts_delete`")
+
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+
+    with TemporaryDirectory() as temp_dir:
+        db_path = args.db or Path(temp_dir) / "benchmark.db"
+        args.seed = not db_path.exists()
+
+        prepare_environment(db_path)
+        migrate()
+
+        results = asyncio.run(run_scenarios(args))
+
+    report = make_report(
+        args.scale,
+        results,
+        rows=args.rows,
+        users=args.users,
+        requests=args.requests,
+        export_size=args.export_size,
+        import_size=args.import_size,
+    )
+
+    if args.compare:
+        baseline_path = get_baseline_path(args.scale)
+
+        if not baseline_path.exists():
+            sys.exit(f"No baseline at {baseline_path}, run with `--save` first")
+
+        if compare_reports(load_report(baseline_path), report, args.threshold):
+            sys.exit(1)
+
+    if args.save:
+        print(f"Baseline saved to {save_report(report)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import platform
+from datetime import UTC, datetime
+from os import environ
+from pathlib import Path
+from statistics import mean, quantiles
+from subprocess import CalledProcessError, check_output
+from time import perf_counter
+from typing import Awaitable, Callable
+
+from pydantic import BaseModel
+
+SRC_DIR = Path(__file__).parent.parent
+ROOT_DIR = SRC_DIR.parent
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+
+class Measurement(BaseModel):
+    name: str
+    count: int
+    total_s: float
+    rps: float
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<40} n={self.count:<6} rps={self.rps:>9.1f} "
+            f"mean={self.mean_ms:>8.3f}ms p50={self.p50_ms:>8.3f}ms "
+            f"p99={self.p99_ms:>8.3f}ms"
+        )
+
+
+class Report(BaseModel):
+    name: str
+    commit: str | None = None
+    python: str = platform.python_version()
+    created_at: datetime
+    parameters: dict = {}
+    results: list[Measurement]
+
+    def get_result(self, name: str) -> Measurement | None:
+        return next((result for result in self.results if result.name == name), None)
+
+
+def get_commit() -> str | None:
+    try:
+        return check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            text=True,
+        ).strip()
+    except (CalledProcessError, OSError):
+        return None
+
+
+def make_report(name: str, results: list[Measurement], **parameters) -> Report:
+    return Report(
+        name=name,
+        commit=get_commit(),
+        created_at=datetime.now(UTC),
+        parameters=parameters,
+        results=results,
+    )
+
+
+def get_baseline_path(name: str) -> Path:
+    return BASELINES_DIR / f"{name}.json"
+
+
+def save_report(report: Report, path: Path | None = None) -> Path:
+    path = path or get_baseline_path(report.name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(report.model_dump_json(indent=2) + "\n")
+    return path
+
+
+def load_report(path: Path) -> Report:
+    return Report.model_validate_json(path.read_text())
+
+
+def compare_reports(baseline: Report, current: Report, threshold: float) -> list[str]:
+    """
+    Prints p50/p99 change against the baseline,
+    a result is a regression when its p50 grew by more than `threshold` (0.1 is 10%)
+    :return: names of regressed results
+    """
+    regressions = []
+
+    print(f"baseline {baseline.commit} ({baseline.created_at:%Y-%m-%d %H:%M})")
+
+    for result in current.results:
+        base = baseline.get_result(result.name)
+
+        if base is None:
+            print(f"{result.name:<40} new")
+            continue
+
+        p50_change = result.p50_ms / base.p50_ms - 1
+        p99_change = result.p99_ms / base.p99_ms - 1
+        regressed = p50_change > threshold
+
+        if regressed:
+            regressions.append(result.name)
+
+        print(
+            f"{result.name:<40} p50 {base.p50_ms:>8.3f} -> {result.p50_ms:>8.3f}ms "
+            f"({p50_change:>+7.1%}) p99 {base.p99_ms:>8.3f} -> {result.p99_ms:>8.3f}ms "
+            f"({p99_change:>+7.1%}){'  REGRESSION' if regressed else ''}"
+        )
+
+    return regressions
+
+
+def prepare_environment(db_path: Path) -> None:
+    """
+    Must be called before `core.settings` is imported
+    """
+    environ["APP.DB.DRIVERNAME"] = "sqlite+aiosqlite"
+    environ["APP.DB.NAME"] = db_path.absolute().as_posix()
+    environ.setdefault("APP.LOGGING.LOGLEVEL", "WARNING")
+
+
+def migrate() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config((ROOT_DIR / "alembic.ini").as_posix())
+    config.set_main_option("script_location", (ROOT_DIR / "alembic").as_posix())
+
+    command.upgrade(config, "head")
+
+
+async def measure(
+    name: str,
+    call: Callable[[], Awaitable],
+    count: int,
+    warmup: int = 10,
+) -> Measurement:
+    for _ in range(warmup):
+        await call()
+
+    timings = []
+    started_at = perf_counter()
+
+    for _ in range(count):
+        call_started_at = perf_counter()
+        await call()
+        timings.append(perf_counter() - call_started_at)
+
+    return build_measurement(name, timings, perf_counter() - started_at)
+
+
+def build_measurement(name: str, timings: list[float], total: float) -> Measurement:
+    """
+    :param timings: call durations in seconds
+    :param total: wall time in seconds,
+        lower than the sum of timings for concurrent calls
+    :return: Measurement
+    """
+    percentiles = quantiles(timings, n=100, method="inclusive")
+
+    return Measurement(
+        name=name,
+        count=len(timings),
+        total_s=total,
+        rps=len(timings) / total,
+        mean_ms=mean(timings) * 1000,
+        p50_ms=percentiles[49] * 1000,
+        p99_ms=percentiles[98] * 1000,
+    )
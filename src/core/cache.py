@@ -0,0 +1,91 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry expiration, not thread-safe (event loop only)
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+
+        if item is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+
+        if expires_at <= monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+
+        if ttl is None:
+            ttl = self.ttl
+
+        if ttl <= 0:
+            return
+
+        self._data[key] = (monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(size={len(self)}, maxsize={self.maxsize}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
+
+
+class RecentKeys:
+    """
+    Keys marked within the last `ttl` seconds,
+    e.g. users whose writes replicas may lag behind
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 10_000) -> None:
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def add(self, key: Hashable) -> None:
+        self._cache.set(key, True)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._cache.get(key, False)
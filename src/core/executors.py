@@ -0,0 +1,131 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+from typing import Any, Callable
+
+from fastapi import status
+
+from core.metrics import (
+    executor_in_flight,
+    executor_queue_depth,
+    executor_rejected,
+    executor_wait,
+)
+from exceptions import APIError
+
+
+class BoundedExecutor:
+    """
+    Thread pool for blocking calls with a bounded wait queue.
+    Counters are only mutated on the event loop thread.
+    With `metrics_name` they are exported as `executor_*` metrics
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue_size: int,
+        thread_name_prefix: str = "",
+        metrics_name: str | None = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.thread_name_prefix = thread_name_prefix
+        self.metrics_name = metrics_name
+
+        self.in_flight: int = 0
+        self.completed: int = 0
+        self.rejected: int = 0
+        self.wait_time_total: float = 0.0
+        self.wait_time_max: float = 0.0
+
+        self._executor: ThreadPoolExecutor | None = None
+
+        if metrics_name is not None:
+            executor_in_flight.set_function(
+                lambda: self.in_flight,
+                executor=metrics_name,
+            )
+            executor_queue_depth.set_function(
+                lambda: self.queue_depth,
+                executor=metrics_name,
+            )
+            executor_rejected.set_function(lambda: self.rejected, executor=metrics_name)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    @property
+    def wait_time_avg(self) -> float:
+        return self.wait_time_total / self.completed if self.completed else 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_time_avg": self.wait_time_avg,
+            "wait_time_max": self.wait_time_max,
+        }
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.thread_name_prefix,
+            )
+
+        return self._executor
+
+    @classmethod
+    def __timed_call(cls, func: Callable, *args, **kwargs) -> tuple[float, Any]:
+        return perf_counter(), func(*args, **kwargs)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        if self.queue_depth >= self.max_queue_size:
+            self.rejected += 1
+            raise APIError(
+                "Сервер перегружен, повторите попытку позже",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        loop = asyncio.get_running_loop()
+        submitted_at = perf_counter()
+
+        self.in_flight += 1
+
+        try:
+            started_at, result = await loop.run_in_executor(
+                self.__get_executor(),
+                partial(self.__timed_call, func, *args, **kwargs),
+            )
+
+        finally:
+            self.in_flight -= 1
+
+        wait_time = started_at - submitted_at
+
+        self.completed += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+
+        if self.metrics_name is not None:
+            executor_wait.observe(wait_time, executor=self.metrics_name)
+
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(max_workers={self.max_workers}, "
+            f"queue_depth={self.queue_depth}/{self.max_queue_size})"
+        )
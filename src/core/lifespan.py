@@ -5,9 +5,10 @@ from typing import Self
 from fastapi import FastAPI
 from starlette.staticfiles import StaticFiles
 
+from apps.auth.managers import password_executor
 from apps.docs.utils import make_openapi_json
 from core.settings import settings
-from core.utils import setup_logging
+from core.utils import setup_logging, shutdown_logging
 from database.utils import db, set_triggers
 
 logger = getLogger(__name__)
@@ -36,12 +37,20 @@ class Lifespan:
             echo_pool=settings.db.echo_pool,
             max_overflow=settings.db.max_overflow,
             pool_size=settings.db.pool_size,
+            pg_connection_mode=settings.db.pg_connection_mode,
+            statement_cache_size=settings.db.statement_cache_size,
+            prepared_statement_cache_size=settings.db.prepared_statement_cache_size,
+            sqlite_pragmas=settings.db.sqlite.pragmas,
+            replica_urls=settings.db.replica_urls,
         )
         await set_triggers()
 
     async def on_shutdown(self) -> None:
+        password_executor.shutdown()
         await db.close()
 
+        shutdown_logging()
+
     @asynccontextmanager
     async def lifespan(self, app: FastAPI) -> AbstractAsyncContextManager[Self]:
         await self.on_startup(app)
@@ -0,0 +1,326 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+
+    values = ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels)
+    return f"{{{values}}}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    Prometheus metric with a fixed set of label names, not thread-safe (event loop only)
+    """
+
+    type_name: str = ""
+
+    def __init__(
+        self, name: str, description: str, labelnames: tuple[str, ...] = ()
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+
+    def _get_labels(self, labels: dict[str, str]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def samples(self) -> Iterator[tuple[str, Labels, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(
+            f"{name}{format_labels(labels)} {format_value(value)}"
+            for name, labels, value in self.samples()
+        )
+        return "\n".join(lines)
+
+
+class ValueMetric(Metric):
+    """
+    Values are either set directly or read from a callback at collection time
+    """
+
+    def __init__(
+        self, name: str, description: str, labelnames: tuple[str, ...] = ()
+    ) -> None:
+        super().__init__(name, description, labelnames)
+        self._values: dict[Labels, float] = {}
+        self._functions: dict[Labels, Callable[[], float]] = {}
+
+    def inc(self, value: float = 1, **labels: str) -> None:
+        key = self._get_labels(labels)
+        self._values[key] = self._values.get(key, 0) + value
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        self._functions[self._get_labels(labels)] = function
+
+    def remove(self, **labels: str) -> None:
+        key = self._get_labels(labels)
+        self._values.pop(key, None)
+        self._functions.pop(key, None)
+
+    def samples(self) -> Iterator[tuple[str, Labels, float]]:
+        for labels, value in self._values.items():
+            yield self.name, labels, value
+
+        for labels, function in self._functions.items():
+            yield self.name, labels, function()
+
+
+class Counter(ValueMetric):
+    """
+    A callback must return a value that only grows, e.g. a counter kept by a handler
+    """
+
+    type_name = "counter"
+
+    def get(self, **labels: str) -> float:
+        key = self._get_labels(labels)
+
+        if key in self._functions:
+            return self._functions[key]()
+
+        return self._values.get(key, 0)
+
+
+class Gauge(ValueMetric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._get_labels(labels)] = value
+
+    def dec(self, value: float = 1, **labels: str) -> None:
+        self.inc(-value, **labels)
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per labels: non-cumulative bucket counts (+Inf last), sum
+        self._values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._get_labels(labels)
+        counts, total = self._values.setdefault(
+            key,
+            ([0] * (len(self.buckets) + 1), [0.0]),
+        )
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def get_count(self, **labels: str) -> int:
+        counts, _ = self._values.get(self._get_labels(labels), ([0], [0.0]))
+        return sum(counts)
+
+    def samples(self) -> Iterator[tuple[str, Labels, float]]:
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    (*labels, ("le", format_value(bound))),
+                    cumulative,
+                )
+
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric `{metric.name}` is already registered")
+
+        self._metrics[metric.name] = metric
+
+    def counter(
+        self, name: str, description: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        counter = Counter(name, description, labelnames)
+        self.register(counter)
+        return counter
+
+    def gauge(
+        self, name: str, description: str, labelnames: tuple[str, ...] = ()
+    ) -> Gauge:
+        gauge = Gauge(name, description, labelnames)
+        self.register(gauge)
+        return gauge
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = Histogram(name, description, labelnames, buckets)
+        self.register(histogram)
+        return histogram
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format 0.0.4
+        :return: str
+        """
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+class SQLStats:
+    """
+    SQL statements of one request, filled by cursor events through `sql_stats_var`.
+    The context is copied into SQLAlchemy greenlets, so they mutate the same object
+    """
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.duration: float = 0.0
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+
+
+sql_stats_var: ContextVar[SQLStats | None] = ContextVar("sql_stats", default=None)
+
+registry = MetricsRegistry()
+
+# =====================================|Database|======================================= #
+db_pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pool connection",
+    ("pool",),
+    buckets=POOL_WAIT_BUCKETS,
+)
+db_pool_checked_out = registry.gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out",
+    ("pool",),
+)
+db_pool_overflow = registry.gauge(
+    "db_pool_overflow",
+    "Overflow connections in use above pool_size",
+    ("pool",),
+)
+db_pool_size = registry.gauge(
+    "db_pool_size",
+    "Configured pool_size",
+    ("pool",),
+)
+db_pool_connections_created = registry.counter(
+    "db_pool_connections_created_total",
+    "New DBAPI connections opened by the pool",
+    ("pool",),
+)
+db_pool_connections_invalidated = registry.counter(
+    "db_pool_connections_invalidated_total",
+    "Connections invalidated (hard or soft) by the pool",
+    ("pool",),
+)
+
+# =====================================|Executors|====================================== #
+executor_in_flight = registry.gauge(
+    "executor_in_flight",
+    "Calls running or waiting in the thread pool",
+    ("executor",),
+)
+executor_queue_depth = registry.gauge(
+    "executor_queue_depth",
+    "Calls waiting for a free worker",
+    ("executor",),
+)
+executor_rejected = registry.counter(
+    "executor_rejected_total",
+    "Calls rejected with 503 because the wait queue was full",
+    ("executor",),
+)
+executor_wait = registry.histogram(
+    "executor_wait_seconds",
+    "Time a call waited for a free worker",
+    ("executor",),
+    buckets=POOL_WAIT_BUCKETS,
+)
+
+# ======================================|Requests|====================================== #
+http_requests = registry.counter(
+    "http_requests_total",
+    "Finished HTTP requests",
+    ("method", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+http_request_sql_statements = registry.histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per HTTP request",
+    ("method", "route"),
+    buckets=SQL_COUNT_BUCKETS,
+)
+http_request_sql_duration = registry.histogram(
+    "http_request_sql_duration_seconds",
+    "Time spent in SQL per HTTP request",
+    ("method", "route"),
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests being processed",
+)
+http_requests_in_progress.set(0)
+
+# ======================================|Logging|======================================= #
+log_queue_size = registry.gauge(
+    "log_queue_size",
+    "Log records waiting for the listener thread",
+)
+log_queue_dropped = registry.counter(
+    "log_queue_dropped_records_total",
+    "Log records dropped because the queue was full",
+)
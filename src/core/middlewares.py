@@ -1,10 +1,99 @@
+from time import perf_counter
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from apps.auth.middlewares import AuthJWTCookieMiddleware
+from core.metrics import (
+    SQLStats,
+    http_request_duration,
+    http_request_sql_duration,
+    http_request_sql_statements,
+    http_requests,
+    http_requests_in_progress,
+    sql_stats_var,
+)
 from core.settings import settings
 
 
+class MetricsMiddleware:
+    """
+    Request latency per route template and status, SQL statements and time per request.
+    With `settings.metrics.server_timing` the same numbers
+    go to the `Server-Timing` header
+    """
+
+    unmatched_route = "<unmatched>"
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @classmethod
+    def get_route(cls, scope: Scope) -> str:
+        route = scope.get("route")
+        return getattr(route, "path", cls.unmatched_route)
+
+    @classmethod
+    def build_server_timing(cls, sql_stats: SQLStats, started_at: float) -> str:
+        return (
+            f"sql;dur={sql_stats.duration * 1000:.3f};"
+            f'desc="{sql_stats.count} queries", '
+            f"app;dur={(perf_counter() - started_at) * 1000:.3f}"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started_at = perf_counter()
+        sql_stats = SQLStats()
+        sql_stats_token = sql_stats_var.set(sql_stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+                if settings.metrics.server_timing:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        self.build_server_timing(sql_stats, started_at),
+                    )
+
+            await send(message)
+
+        http_requests_in_progress.inc()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sql_stats_var.reset(sql_stats_token)
+            http_requests_in_progress.dec()
+
+            method = scope["method"]
+            route = self.get_route(scope)
+            status = str(status_code)
+
+            http_requests.inc(method=method, status=status)
+            http_request_duration.observe(
+                perf_counter() - started_at,
+                method=method,
+                route=route,
+                status=status,
+            )
+            http_request_sql_statements.observe(
+                sql_stats.count, method=method, route=route
+            )
+            http_request_sql_duration.observe(
+                sql_stats.duration, method=method, route=route
+            )
+
+
 def register_middlewares(app: FastAPI) -> None:
     # ================================|CORS middleware|================================= #
     app.add_middleware(
@@ -14,3 +103,6 @@ def register_middlewares(app: FastAPI) -> None:
         allow_headers=["*"],
     )
     app.add_middleware(AuthJWTCookieMiddleware)
+    # ==============================|Metrics middleware|================================ #
+    if settings.metrics.enabled:
+        app.add_middleware(MetricsMiddleware)
@@ -3,6 +3,8 @@ from fastapi import FastAPI
 from apps.accounts import accounts_router
 from apps.auth import auth_router
 from apps.docs import docs_router
+from apps.metrics import metrics_router
+from core.settings import settings
 
 
 def register_routers(app: FastAPI) -> None:
@@ -18,3 +20,9 @@ def register_routers(app: FastAPI) -> None:
         accounts_router,
         tags=["Accounts"],
     )
+
+    if settings.metrics.enabled:
+        app.include_router(
+            metrics_router,
+            tags=["Metrics"],
+        )
@@ -3,10 +3,11 @@ from sqlalchemy import ScalarResult
 
 
 class PaginationModel(BaseModel):
-    total: int
     page: int
     per_page: int
-    total_pages: int
+    has_next: bool
+    total: int | None = None
+    total_pages: int | None = None
 
 
 class PaginationResultModel(BaseModel):
@@ -14,3 +15,4 @@ class PaginationResultModel(BaseModel):
 
     data: ScalarResult
     pagination: PaginationModel | None = None
+    next_cursor: str | None = None
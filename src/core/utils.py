@@ -3,7 +3,9 @@ from logging.config import dictConfig
 from pathlib import Path
 from warnings import warn
 
+from core.metrics import log_queue_dropped, log_queue_size
 from core.settings import settings
+from log.handlers import start_queue_logging, stop_queue_logging
 
 logger = getLogger(__name__)
 
@@ -11,6 +13,15 @@ logger = getLogger(__name__)
 def setup_logging() -> None:
     dictConfig(settings.logging.dict_config)
 
+    if settings.logging.queue_handler:
+        queue_handler = start_queue_logging(
+            settings.logging.queue_size,
+            settings.logging.queue_drop_policy,
+        )
+
+        log_queue_size.set_function(queue_handler.queue.qsize)
+        log_queue_dropped.set_function(lambda: queue_handler.dropped)
+
     if settings.debug:
         msg = "Debug mode on"
         logger.warning(msg)
@@ -20,4 +31,29 @@ def setup_logging() -> None:
         if settings.logging.sentry:
             import sentry_sdk  # type: ignore
 
-            sentry_sdk.init(settings.logging.sentry, traces_sample_rate=1)
+            from log.sampling import TracesSampler
+
+            traces_sampler = TracesSampler(
+                sample_rate=settings.logging.traces_sample_rate,
+                route_sample_rates=settings.logging.traces_route_sample_rates,
+                exclude_urls=(
+                    settings.static.url,
+                    settings.docs.openapi_url,
+                    settings.metrics.url,
+                    *settings.logging.traces_exclude_urls,
+                ),
+                slow_threshold=settings.logging.traces_slow_threshold,
+            )
+
+            sentry_sdk.init(
+                settings.logging.sentry,
+                traces_sampler=traces_sampler,
+                before_send_transaction=traces_sampler.before_send_transaction,
+            )
+
+
+def shutdown_logging() -> None:
+    stop_queue_logging()
+
+    log_queue_size.remove()
+    log_queue_dropped.remove()
@@ -1,8 +1,11 @@
 import threading
 from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from itertools import count
 from logging import getLogger
+from typing import Sequence
+from uuid import uuid4
 
-from sqlalchemy import URL, make_url
+from sqlalchemy import URL, event, make_url
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
     AsyncEngine,
@@ -10,6 +13,14 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import StaticPool
+
+from database.pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    instrument_engine,
+    uninstrument_engine,
+)
+from database.profiling import instrument_queries
 
 logger = getLogger(__name__)
 
@@ -20,10 +31,18 @@ class AsyncDatabase:
         self._async_engine: AsyncEngine | None = None
         self._async_sessionmaker: async_sessionmaker[AsyncSession] | None = None
 
+        self._replica_engines: list[AsyncEngine] = []
+        self._replica_sessionmakers: list[async_sessionmaker[AsyncSession]] = []
+        self._replica_counter = count()
+
     @property
     def status(self) -> str:
         return "Connected" if self._async_engine else "Disconnected"
 
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self._replica_sessionmakers)
+
     async def init(
         self,
         engine_url: URL | str,
@@ -32,46 +51,166 @@ class AsyncDatabase:
         echo_pool: bool = False,
         max_overflow: int = 10,
         pool_size: int = 5,
+        pg_connection_mode: str = "pgbouncer_transaction",
+        statement_cache_size: int = 100,
+        prepared_statement_cache_size: int = 100,
+        sqlite_pragmas: dict[str, str | int] | None = None,
+        replica_urls: Sequence[URL | str] = (),
     ) -> None:
+        """
+        :param replica_urls: read-only copies of `engine_url`,
+            used by `session(readonly=True)`
+        """
         self._engine_url = make_url(engine_url)
 
+        engine_options = {
+            "connect_args": connect_args,
+            "echo_sql": echo_sql,
+            "echo_pool": echo_pool,
+            "max_overflow": max_overflow,
+            "pool_size": pool_size,
+            "pg_connection_mode": pg_connection_mode,
+            "statement_cache_size": statement_cache_size,
+            "prepared_statement_cache_size": prepared_statement_cache_size,
+            "sqlite_pragmas": sqlite_pragmas,
+        }
+
+        self._async_engine: AsyncEngine = self.__create_engine(
+            self._engine_url,
+            pool_name="primary",
+            **engine_options,
+        )
+        self._async_sessionmaker: async_sessionmaker[AsyncSession] = async_sessionmaker(
+            self._async_engine,
+            expire_on_commit=False,
+        )
+
+        self._replica_engines = [
+            self.__create_engine(
+                make_url(replica_url),
+                pool_name=f"replica-{replica_idx}",
+                **engine_options,
+            )
+            for replica_idx, replica_url in enumerate(replica_urls)
+        ]
+        self._replica_sessionmakers = [
+            async_sessionmaker(replica_engine, expire_on_commit=False)
+            for replica_engine in self._replica_engines
+        ]
+
+        await self.__check_connect()
+
+    @classmethod
+    def __create_engine(
+        cls,
+        engine_url: URL,
+        pool_name: str,
+        connect_args: dict | None,
+        echo_sql: bool,
+        echo_pool: bool,
+        max_overflow: int,
+        pool_size: int,
+        pg_connection_mode: str,
+        statement_cache_size: int,
+        prepared_statement_cache_size: int,
+        sqlite_pragmas: dict[str, str | int] | None,
+    ) -> AsyncEngine:
         engine_args = {
             "echo": echo_sql,
             "echo_pool": echo_pool,
             "max_overflow": max_overflow,
             "pool_size": pool_size,
+            "poolclass": InstrumentedAsyncAdaptedQueuePool,
         }
 
-        if not connect_args:
-            connect_args = {}
+        connect_args = dict(connect_args or {})
 
-        if "postgresql" in self._engine_url.drivername:
+        if "postgresql" in engine_url.drivername:
             connect_args.update(
-                {
-                    "statement_cache_size": 0,
-                    "prepared_statement_cache_size": 0,
-                },
+                cls.__get_pg_statement_cache_args(
+                    pg_connection_mode,
+                    statement_cache_size,
+                    prepared_statement_cache_size,
+                ),
             )
 
-        elif "sqlite" in self._engine_url.drivername:
-            engine_args.pop("max_overflow")
-            engine_args.pop("pool_size")
+        elif "sqlite" in engine_url.drivername:
+            if cls.__is_sqlite_memory(engine_url):
+                engine_args.pop("max_overflow")
+                engine_args.pop("pool_size")
+                engine_args["poolclass"] = StaticPool
 
-        self._async_engine: AsyncEngine = create_async_engine(
-            self._engine_url, connect_args=connect_args, **engine_args
-        )
-        self._async_sessionmaker: async_sessionmaker[AsyncSession] = async_sessionmaker(
-            self._async_engine,
-            expire_on_commit=False,
+        async_engine = create_async_engine(
+            engine_url, connect_args=connect_args, **engine_args
         )
 
-        await self.__check_connect()
+        if "sqlite" in engine_url.drivername and sqlite_pragmas:
+            cls.__set_sqlite_pragmas(async_engine, sqlite_pragmas)
+
+        instrument_engine(async_engine, pool_name)
+        instrument_queries(async_engine)
+
+        return async_engine
+
+    @classmethod
+    def __get_pg_statement_cache_args(
+        cls,
+        pg_connection_mode: str,
+        statement_cache_size: int,
+        prepared_statement_cache_size: int,
+    ) -> dict:
+        """
+        pgbouncer in transaction mode can hand every transaction to another
+        server connection, so named prepared statements must not outlive it.
+        Direct and session mode connections are pinned and can cache them
+        :return: asyncpg connect args
+        """
+        if pg_connection_mode == "pgbouncer_transaction":
+            return {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+
+        if pg_connection_mode in ("direct", "pgbouncer_session"):
+            return {
+                "statement_cache_size": statement_cache_size,
+                "prepared_statement_cache_size": prepared_statement_cache_size,
+            }
+
+        raise ValueError(f"Unknown PostgreSQL connection mode `{pg_connection_mode}`")
+
+    @classmethod
+    def __is_sqlite_memory(cls, url: URL) -> bool:
+        if url.database in (None, "", ":memory:"):
+            return True
+
+        return url.query.get("mode") == "memory"
+
+    @classmethod
+    def __set_sqlite_pragmas(
+        cls,
+        async_engine: AsyncEngine,
+        sqlite_pragmas: dict[str, str | int],
+    ) -> None:
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def set_pragmas(dbapi_connection, connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+
+            for name, value in sqlite_pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+
+            cursor.close()
 
     async def __check_connect(self) -> None:
         try:
             async with self.connect():
                 logger.info(f"%s %s", self, self.status)
 
+            for replica_engine in self._replica_engines:
+                async with replica_engine.connect():
+                    logger.info("%s replica %s connected", self, replica_engine.url)
+
         except Exception as ex:
             logger.critical(f"%s Connection failed. %s", self, ex)
             raise ex
@@ -81,18 +220,46 @@ class AsyncDatabase:
             return
 
         await self._async_engine.dispose()
+        uninstrument_engine("primary")
+
+        for replica_idx, replica_engine in enumerate(self._replica_engines):
+            await replica_engine.dispose()
+            uninstrument_engine(f"replica-{replica_idx}")
 
         self._async_engine = None
         self._async_sessionmaker = None
 
+        self._replica_engines = []
+        self._replica_sessionmakers = []
+
         logger.info(f"%s %s", self, self.status)
 
-    @asynccontextmanager
-    async def session(self) -> AbstractAsyncContextManager[AsyncSession]:
+    def __get_sessionmaker(self, readonly: bool) -> async_sessionmaker[AsyncSession]:
+        """
+        Round-robin over replicas for read-only sessions, the primary otherwise
+        :return: async_sessionmaker
+        """
+        if readonly and self._replica_sessionmakers:
+            replica_idx = next(self._replica_counter) % len(self._replica_sessionmakers)
+            return self._replica_sessionmakers[replica_idx]
+
+        return self._async_sessionmaker
+
+    def create_session(self, readonly: bool = False) -> AsyncSession:
+        """
+        The caller closes the session, see `session()` for a context manager
+        :return: AsyncSession
+        """
         if self._async_sessionmaker is None:
             raise IOError(f"{self.__repr__()} is not initialized")
 
-        async with self._async_sessionmaker() as session:  # type: AsyncSession
+        return self.__get_sessionmaker(readonly)()
+
+    @asynccontextmanager
+    async def session(
+        self, readonly: bool = False
+    ) -> AbstractAsyncContextManager[AsyncSession]:
+        async with self.create_session(readonly) as session:  # type: AsyncSession
             try:
                 yield session
             except Exception:
@@ -122,6 +289,7 @@ class AsyncDatabase:
                 "user": self._engine_url.username,
                 "host": self._engine_url.host,
                 "port": self._engine_url.port,
+                "replicas": len(self._replica_engines),
             }
 
         else:
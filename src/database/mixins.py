@@ -1,19 +1,33 @@
-from typing import Any, AsyncGenerator, Sequence
-
-from sqlalchemy import ScalarResult, Select, Table
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import date
+from enum import Enum
+from itertools import batched
+from json import JSONDecodeError, dumps, loads
+from typing import Any, AsyncGenerator, Callable, Iterable, Sequence
+
+from sqlalchemy import Select, Table
 from sqlalchemy import delete as sa_delete
 from sqlalchemy import func
+from sqlalchemy import insert as sa_insert
 from sqlalchemy import select as sa_select
+from sqlalchemy import tuple_
 from sqlalchemy import update as sa_update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import InstrumentedAttribute, Mapped, mapped_column
 
 from core.schemas import PaginationModel, PaginationResultModel
+from database.session import is_request_scoped, mark_writes, run_after_commit
 from database.tps import created_at, updated_at
+from exceptions import ValidationError
 
 DEFAULT_LIMIT: int = 200
 DEFAULT_ORDERING: str = "id"
 DEFAULT_MAX_PAGES: int = 1000
+DEFAULT_MAX_ROWS: int = DEFAULT_LIMIT * DEFAULT_MAX_PAGES
+DEFAULT_BATCH_SIZE: int = 1000
+# Order column types keyset cursors can hold, dates are stored as ISO strings
+CURSOR_TYPES: tuple[type, ...] = (str, int, float, date, Enum)
 
 
 class IDPKMixin:
@@ -53,87 +67,309 @@ class CRUDMixin:
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(ORM obj={self.__table__})"
 
+    async def commit(self) -> None:
+        """
+        A request-scoped session is only flushed here
+        and committed once when the request ends
+        """
+        if is_request_scoped(self.async_session):
+            await self.async_session.flush()
+            mark_writes(self.async_session)
+        else:
+            await self.async_session.commit()
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Runs `callback` (e.g. cache invalidation) once the writes are committed
+        """
+        run_after_commit(self.async_session, callback)
+
     async def count(self, stmt: Select) -> int:
         count_stmt = sa_select(func.count()).select_from(stmt.subquery())
-        result = await self.async_session.scalar(count_stmt)
-        await self.async_session.commit()
-        return result
+        return await self.async_session.scalar(count_stmt)
 
     async def update(self, instances: list[dict]) -> None:
         stmt = sa_update(self.__table__)
         await self.async_session.execute(stmt, instances)
-        await self.async_session.commit()
+        await self.commit()
 
-    async def create(self, instances: list[dict | Table]) -> Any:
+    async def create(self, instances: list[dict | Table], commit: bool = True) -> Any:
         items = [
             self.__table__(**instance) if isinstance(instance, dict) else instance
             for instance in instances
         ]
         self.async_session.add_all(items)
-        await self.async_session.commit()
+
+        if commit:
+            await self.commit()
+        else:
+            await self.async_session.flush()
+
         return items
 
+    async def bulk_create(
+        self,
+        instances: Iterable[dict],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        returning: bool = False,
+        commit: bool = True,
+    ) -> list[int] | None:
+        """
+        Core `INSERT` executemany in batches,
+        bypasses ORM instances and the identity map.
+        All dicts must have the same keys
+        :return: ids of created rows in input order if `returning` else None
+        """
+        table = self.__table__.__table__
+        stmt = sa_insert(table)
+
+        if returning:
+            stmt = stmt.returning(table.c.id, sort_by_parameter_order=True)
+
+        created_ids = []
+
+        for batch in batched(instances, batch_size):
+            result = await self.async_session.execute(stmt, list(batch))
+
+            if returning:
+                created_ids.extend(result.scalars().all())
+
+        if commit:
+            await self.commit()
+
+        return created_ids if returning else None
+
     async def delete(self, where: list | tuple) -> None:
         stmt = sa_delete(self.__table__).where(*where)
         await self.async_session.execute(stmt)
-        await self.async_session.commit()
+        await self.commit()
 
 
 class PaginationMixin(CRUDMixin):
     @classmethod
-    def build_pagination(cls, limit: int, page: int, rows_count: int) -> PaginationModel:
-        pages = rows_count // limit
-        total_pages = pages if rows_count % limit == 0 else pages + 1
-
+    def build_pagination(
+        cls,
+        limit: int,
+        page: int,
+        has_next: bool,
+        rows_count: int | None = None,
+    ) -> PaginationModel:
         pagination_dict = {
-            "total": rows_count,
             "page": page,
             "per_page": limit,
-            "total_pages": total_pages,
+            "has_next": has_next,
         }
 
+        if rows_count is not None:
+            pages = rows_count // limit
+            pagination_dict["total"] = rows_count
+            pagination_dict["total_pages"] = (
+                pages if rows_count % limit == 0 else pages + 1
+            )
+
         return PaginationModel.model_validate(pagination_dict)
 
+    @classmethod
+    def get_cursor_type(cls, order_column: Any) -> type:
+        """
+        Python type of the order column, cursors only hold JSON values and ISO dates
+        :return: type
+        """
+        try:
+            python_type = order_column.type.python_type
+        except (AttributeError, NotImplementedError):
+            python_type = None
+
+        if python_type is None or not issubclass(python_type, CURSOR_TYPES):
+            raise TypeError(f"{order_column} can't be used as a cursor order column")
+
+        return python_type
+
+    @classmethod
+    def build_cursor(cls, order_value: Any, row_id: int) -> str:
+        if isinstance(order_value, date):
+            order_value = order_value.isoformat()
+
+        raw_cursor = dumps([order_value, row_id], separators=(",", ":"))
+        return urlsafe_b64encode(raw_cursor.encode()).decode()
+
+    @classmethod
+    def parse_cursor(cls, cursor: str, order_type: type) -> tuple[Any, int]:
+        """
+        :param order_type: type of the order column, see `get_cursor_type`
+        :return: order value converted to `order_type` (or None) and row id
+        """
+        try:
+            order_value, row_id = loads(urlsafe_b64decode(cursor.encode()))
+
+            if order_value is not None:
+                order_value = cls.__parse_cursor_value(order_value, order_type)
+
+        except (BinasciiError, JSONDecodeError, TypeError, ValueError):
+            raise ValidationError("Invalid cursor", locations=["cursor"])
+
+        if not isinstance(row_id, int) or isinstance(row_id, bool):
+            raise ValidationError("Invalid cursor", locations=["cursor"])
+
+        return order_value, row_id
+
+    @classmethod
+    def __parse_cursor_value(cls, value: Any, order_type: type) -> Any:
+        if issubclass(order_type, date):
+            if not isinstance(value, str):
+                raise TypeError(value)
+
+            return order_type.fromisoformat(value)
+
+        # bool is an int, an int is a valid float
+        if isinstance(value, bool) and not issubclass(order_type, bool):
+            raise TypeError(value)
+
+        if issubclass(order_type, float) and isinstance(value, int):
+            return float(value)
+
+        if issubclass(order_type, Enum):
+            return order_type(value)
+
+        if not isinstance(value, order_type):
+            raise TypeError(value)
+
+        return value
+
+    def _get_order_column(self, order_by: Any) -> Any:
+        if isinstance(order_by, str):
+            return getattr(self.__table__, order_by)
+
+        return order_by
+
     async def paginated_result(
         self,
         stmt: Any,
         page: int,
         limit: int | None = None,
         order_by: Any | None = None,
+        cursor: str | None = None,
+        keyset: bool = False,
+        with_total: bool = False,
     ) -> PaginationResultModel:
+        """
+        Offset pages fetch `limit + 1` rows to know `has_next` without counting
+        :param with_total: also run `count(*)` for `total` and `total_pages`
+        :return: PaginationResultModel, `pagination` is set unless it is the only page
+        """
         if limit is None:
             limit = DEFAULT_LIMIT
 
         if order_by is None:
             order_by = DEFAULT_ORDERING
 
-        rows_count = await self.count(stmt)
+        if keyset or cursor is not None:
+            return await self.keyset_result(stmt, limit, order_by, cursor)
 
-        result = {}
         offset = (page - 1) * limit
 
-        if rows_count > limit:
-            result["pagination"] = self.build_pagination(limit, page, rows_count)
+        frozen_result = (
+            await self.async_session.execute(
+                stmt.order_by(order_by).limit(limit + 1).offset(offset),
+            )
+        ).freeze()
+        rows = frozen_result().all()
+
+        has_next = len(rows) > limit
+
+        if has_next:
+            frozen_result = frozen_result.with_new_rows(rows[:limit])
+
+        result = {"data": frozen_result().scalars()}
+
+        if with_total:
+            rows_count = await self.count(stmt)
+            result["pagination"] = self.build_pagination(
+                limit, page, has_next, rows_count
+            )
+
+        elif has_next or page > 1:
+            result["pagination"] = self.build_pagination(limit, page, has_next)
 
-        result["data"] = await self.__limited_scalars(stmt, limit, offset, order_by)
         return PaginationResultModel.model_validate(result)
 
-    async def __limited_scalars(
-        self, stmt: Any, limit: int, offset: int, order_by: Any
-    ) -> ScalarResult:
-        result = await self.async_session.scalars(
-            stmt.limit(limit).offset(offset).order_by(order_by)
-        )
-        await self.async_session.commit()
-        return result
+    async def keyset_result(
+        self,
+        stmt: Any,
+        limit: int,
+        order_by: Any,
+        cursor: str | None = None,
+    ) -> PaginationResultModel:
+        """
+        Seek pagination on `(order_by, id)`: every page costs the same at any depth.
+        `order_by` may be an expression (e.g. a full-text rank),
+        it is selected to build the cursor
+        :return: PaginationResultModel with `next_cursor` if more rows exist
+        """
+        order_column = self._get_order_column(order_by)
+        id_column = self.__table__.id
+        is_attribute = isinstance(order_column, InstrumentedAttribute)
+        order_type = self.get_cursor_type(order_column)
+
+        if not is_attribute:
+            stmt = stmt.add_columns(order_column)
+
+        if order_column is id_column:
+            seek_columns = (id_column,)
+        else:
+            seek_columns = (order_column, id_column)
+
+        if cursor is not None:
+            order_value, row_id = self.parse_cursor(cursor, order_type)
+            seek_values = (row_id,) if len(seek_columns) == 1 else (order_value, row_id)
+
+            stmt = stmt.where(tuple_(*seek_columns) > tuple_(*seek_values))
+
+        frozen_result = (
+            await self.async_session.execute(
+                stmt.order_by(*seek_columns).limit(limit + 1),
+            )
+        ).freeze()
+        rows = frozen_result().all()
+
+        result = {}
+
+        if len(rows) > limit:
+            last_instance, *selected_values = rows[limit - 1]
+
+            if is_attribute:
+                order_value = getattr(last_instance, order_column.key)
+            else:
+                order_value = selected_values[0]
+
+            result["next_cursor"] = self.build_cursor(order_value, last_instance.id)
+            frozen_result = frozen_result.with_new_rows(rows[:limit])
+
+        result["data"] = frozen_result().scalars()
+        return PaginationResultModel.model_validate(result)
 
     @classmethod
-    async def _get_paginated_result(
-        cls, db_method, total_pages: int, **load_options
-    ) -> AsyncGenerator[PaginationResultModel, None]:
-        for page in range(2, total_pages + 1):
-            load_options.update({"page": page})
-            yield await db_method(**load_options)
+    async def _aiter_keyset_load(
+        cls,
+        db_method,
+        max_pages: int | None,
+        **load_options,
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        load_options["keyset"] = True
+        loaded_pages = 0
+
+        while max_pages is None or loaded_pages < max_pages:
+            result = await db_method(**load_options)  # type: PaginationResultModel
+            data = result.data.all()
+            loaded_pages += 1
+
+            if data:
+                yield data
+
+            if not result.next_cursor:
+                return
+
+            load_options["cursor"] = result.next_cursor
 
     async def aiter_load(
         self,
@@ -141,28 +377,62 @@ class PaginationMixin(CRUDMixin):
         *,
         max_pages: int | None = DEFAULT_MAX_PAGES,
         per_page: int = DEFAULT_LIMIT,
+        keyset: bool = False,
         **load_options,
     ) -> AsyncGenerator[Sequence[Any], None]:  # Note: Количество подгружаемых строк (см)
-        result = await db_method(**load_options)  # type: PaginationResultModel
-        data = result.data.all()
+        load_options["limit"] = per_page
+
+        if keyset:
+            async for data in self._aiter_keyset_load(
+                db_method, max_pages, **load_options
+            ):
+                yield data
 
-        if not data:
             return
 
-        yield data
+        page = 1
 
-        if not result.pagination:
-            return
+        while max_pages is None or page <= max_pages:
+            load_options["page"] = page
+            result = await db_method(**load_options)  # type: PaginationResultModel
+            data = result.data.all()
 
-        if max_pages is None or result.pagination.total_pages <= max_pages:
-            total_pages = result.pagination.total_pages
+            if data:
+                yield data
 
-        else:
-            total_pages = max_pages
+            if not result.pagination or not result.pagination.has_next:
+                return
 
-        load_options["limit"] = per_page
+            page += 1
+
+    async def astream_load(
+        self,
+        stmt: Any,
+        *,
+        per_page: int = DEFAULT_LIMIT,
+        max_rows: int | None = DEFAULT_MAX_ROWS,
+        order_by: Any | None = None,
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        """
+        Single query over a server-side cursor, yields chunks of `per_page` rows
+        :return: AsyncGenerator of row chunks, at most `max_rows` rows in total
+        """
+        if order_by is None:
+            order_by = DEFAULT_ORDERING
+
+        stmt = stmt.order_by(self._get_order_column(order_by))
+
+        if max_rows is not None:
+            stmt = stmt.limit(max_rows)
+
+        result = await self.async_session.stream_scalars(
+            stmt,
+            execution_options={"yield_per": per_page},
+        )
+
+        try:
+            async for partition in result.partitions():
+                yield partition
 
-        async for paginated_result in self._get_paginated_result(
-            db_method, total_pages, **load_options
-        ):
-            yield paginated_result.data.all()
+        finally:
+            await result.close()
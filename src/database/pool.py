@@ -0,0 +1,76 @@
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from core.metrics import (
+    db_pool_checked_out,
+    db_pool_checkout_wait,
+    db_pool_connections_created,
+    db_pool_connections_invalidated,
+    db_pool_overflow,
+    db_pool_size,
+)
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Times `_do_get`: waiting for a free connection, or opening a new one within overflow
+    """
+
+    metrics_name: str = "primary"
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = perf_counter()
+
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(
+                perf_counter() - started_at, pool=self.metrics_name
+            )
+
+    def recreate(self) -> QueuePool:
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def instrument_engine(async_engine: AsyncEngine, pool_name: str) -> None:
+    sync_engine = async_engine.sync_engine
+
+    if isinstance(sync_engine.pool, InstrumentedAsyncAdaptedQueuePool):
+        sync_engine.pool.metrics_name = pool_name
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record) -> None:
+        db_pool_connections_created.inc(pool=pool_name)
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception) -> None:
+        db_pool_connections_invalidated.inc(pool=pool_name)
+
+    @event.listens_for(sync_engine, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception) -> None:
+        db_pool_connections_invalidated.inc(pool=pool_name)
+
+    # `engine.pool` is replaced on `dispose()`, always read the current one
+    if isinstance(sync_engine.pool, QueuePool):
+        db_pool_checked_out.set_function(
+            lambda: sync_engine.pool.checkedout(),
+            pool=pool_name,
+        )
+        db_pool_overflow.set_function(
+            lambda: max(0, sync_engine.pool.overflow()),
+            pool=pool_name,
+        )
+        db_pool_size.set_function(
+            lambda: sync_engine.pool.size(),
+            pool=pool_name,
+        )
+
+
+def uninstrument_engine(pool_name: str) -> None:
+    for gauge in (db_pool_checked_out, db_pool_overflow, db_pool_size):
+        gauge.remove(pool=pool_name)
@@ -0,0 +1,38 @@
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.metrics import sql_stats_var
+
+QUERY_STARTED_AT_KEY = "query_started_at"
+
+
+def instrument_queries(async_engine: AsyncEngine) -> None:
+    """
+    Attributes statement count and time to the request `SQLStats` in the current context
+    """
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        connection, cursor, statement, parameters, context, executemany
+    ) -> None:
+        connection.info.setdefault(QUERY_STARTED_AT_KEY, []).append(perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(
+        connection, cursor, statement, parameters, context, executemany
+    ) -> None:
+        started_at = connection.info[QUERY_STARTED_AT_KEY].pop()
+        sql_stats = sql_stats_var.get()
+
+        if sql_stats is not None:
+            sql_stats.add(perf_counter() - started_at)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context) -> None:
+        connection = exception_context.connection
+
+        if connection is not None and connection.info.get(QUERY_STARTED_AT_KEY):
+            connection.info[QUERY_STARTED_AT_KEY].pop()
@@ -0,0 +1,92 @@
+from contextvars import ContextVar
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.helper import AsyncDatabase
+
+REQUEST_SCOPED_KEY = "request_scoped"
+HAS_WRITES_KEY = "has_writes"
+AFTER_COMMIT_KEY = "after_commit"
+
+
+def is_request_scoped(async_session: AsyncSession) -> bool:
+    return async_session.info.get(REQUEST_SCOPED_KEY, False)
+
+
+def mark_writes(async_session: AsyncSession) -> None:
+    async_session.info[HAS_WRITES_KEY] = True
+
+
+def run_after_commit(async_session: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Request-scoped sessions run `callback` once the request is committed,
+    others are committed by the caller already and run it at once
+    """
+    if is_request_scoped(async_session):
+        async_session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+    else:
+        callback()
+
+
+class RequestSessions:
+    """
+    Unit of work of one request: a session per `readonly` flag, created on first use
+    and shared by everything in the request.
+    Without replicas both flags share one session.
+    Sessions begin on the first statement, only a session with writes is committed
+    """
+
+    def __init__(self, database: AsyncDatabase) -> None:
+        self.database = database
+        self.closed = False
+        self._sessions: dict[bool, AsyncSession] = {}
+
+    @property
+    def has_writes(self) -> bool:
+        primary_session = self._sessions.get(False)
+        return primary_session is not None and primary_session.info.get(
+            HAS_WRITES_KEY, False
+        )
+
+    def get(self, readonly: bool = False) -> AsyncSession:
+        if self.closed:
+            raise RuntimeError(f"{self.__class__.__name__} is closed")
+
+        readonly = readonly and self.database.has_replicas
+
+        # Reads after a write go to the primary to see it
+        if readonly and self.has_writes:
+            readonly = False
+
+        if readonly not in self._sessions:
+            async_session = self.database.create_session(readonly=readonly)
+            async_session.info[REQUEST_SCOPED_KEY] = True
+            self._sessions[readonly] = async_session
+
+        return self._sessions[readonly]
+
+    async def close(self, commit: bool = True) -> None:
+        self.closed = True
+        callbacks = []
+
+        try:
+            for async_session in self._sessions.values():
+                if commit and async_session.info.get(HAS_WRITES_KEY):
+                    await async_session.commit()
+                    callbacks.extend(async_session.info.get(AFTER_COMMIT_KEY, ()))
+
+        finally:
+            for async_session in self._sessions.values():
+                await async_session.close()
+
+            self._sessions.clear()
+
+        for callback in callbacks:
+            callback()
+
+
+request_sessions_var: ContextVar[RequestSessions | None] = ContextVar(
+    "request_sessions",
+    default=None,
+)
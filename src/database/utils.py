@@ -1,20 +1,57 @@
 from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.helper import AsyncDatabase
 from database.mixins import AuditMixin
+from database.session import RequestSessions, request_sessions_var
 from database.triggers import on_update_trigger
 
 db = AsyncDatabase()
 
 
 @asynccontextmanager
-async def get_async_session() -> AbstractAsyncContextManager[AsyncSession]:
-    async with db.session() as async_session:  # type: AsyncSession
+async def get_async_session(
+    readonly: bool = False,
+) -> AbstractAsyncContextManager[AsyncSession]:
+    """
+    Inside a request the request session is shared and stays open after the block,
+    otherwise (scripts, streaming responses) a new session is opened and closed
+    """
+    request_sessions = request_sessions_var.get()
+
+    if request_sessions is not None and not request_sessions.closed:
+        yield request_sessions.get(readonly=readonly)
+        return
+
+    async with db.session(readonly=readonly) as async_session:  # type: AsyncSession
         yield async_session
 
 
+async def get_request_sessions() -> AsyncGenerator[RequestSessions, None]:
+    """
+    App dependency: the request unit of work, committed before the response is sent
+    if anything was written, rolled back on errors
+    :return: RequestSessions, `.get(readonly)` opens the session on first use
+    """
+    request_sessions = RequestSessions(db)
+    token = request_sessions_var.set(request_sessions)
+
+    try:
+        yield request_sessions
+
+    except Exception:
+        await request_sessions.close(commit=False)
+        raise
+
+    else:
+        await request_sessions.close(commit=True)
+
+    finally:
+        request_sessions_var.reset(token)
+
+
 async def set_triggers() -> None:
     async with get_async_session() as async_session:  # type: AsyncSession
         audit_tables = [d.__tablename__ for d in AuditMixin.__subclasses__()]  # type: ignore
@@ -1,3 +1,4 @@
+from json import dumps
 from logging import CRITICAL, DEBUG, ERROR, INFO, NOTSET, WARNING, Formatter, LogRecord
 
 
@@ -31,3 +32,40 @@ class ColourFormatter(Formatter):
         log_fmt = self.formats.get(record.levelno)
         formatter = Formatter(fmt=log_fmt, datefmt=self.datefmt)
         return formatter.format(record)
+
+
+class JSONFormatter(Formatter):
+    """
+    One JSON object per line, `extra` fields are added as is
+    """
+
+    RESERVED_ATTRS: frozenset[str] = frozenset(
+        (*vars(LogRecord("", NOTSET, "", 0, "", None, None)), "message", "asctime"),
+    )
+
+    def __init__(self, datefmt: str | None = None) -> None:
+        super().__init__(datefmt=datefmt)
+
+    def format(self, record: LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+
+        if record.exc_text:
+            data["exception"] = record.exc_text
+
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+
+        for key, value in record.__dict__.items():
+            if key not in self.RESERVED_ATTRS:
+                data[key] = value
+
+        return dumps(data, ensure_ascii=False, default=str)
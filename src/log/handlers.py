@@ -0,0 +1,134 @@
+from copy import copy
+from enum import StrEnum, auto
+from logging import Formatter, Handler, LogRecord, getLogger
+from logging.handlers import QueueHandler, QueueListener
+from queue import Empty, Full, Queue
+from threading import Lock
+
+
+class DropPolicy(StrEnum):
+    drop_new = auto()
+    drop_old = auto()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Puts records on a bounded queue and never blocks: when the queue is full the record
+    is dropped (`drop_new`) or replaces the oldest one (`drop_old`)
+    """
+
+    exception_formatter = Formatter()
+
+    def __init__(
+        self, queue: Queue, drop_policy: DropPolicy = DropPolicy.drop_new
+    ) -> None:
+        super().__init__(queue)
+        self.drop_policy = drop_policy
+        self.listener: QueueListener | None = None
+
+        self.__dropped = 0
+        self.__dropped_lock = Lock()
+
+    @property
+    def dropped(self) -> int:
+        return self.__dropped
+
+    def __drop(self) -> None:
+        with self.__dropped_lock:
+            self.__dropped += 1
+
+    def emit(self, record: LogRecord) -> None:
+        # Don't pay for `prepare` when the record is dropped anyway
+        if self.drop_policy == DropPolicy.drop_new and self.queue.full():
+            self.__drop()
+            return
+
+        super().emit(record)
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        """
+        Merges args into the message and renders the traceback to `exc_text`,
+        so listener handlers can still format them with their own formatter
+        :return: LogRecord
+        """
+        record = copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.exception_formatter.formatException(
+                    record.exc_info
+                )
+
+            record.exc_info = None
+
+        return record
+
+    def enqueue(self, record: LogRecord) -> None:
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+
+            except Full:
+                if self.drop_policy == DropPolicy.drop_new:
+                    self.__drop()
+                    return
+
+            try:
+                self.queue.get_nowait()
+                self.__drop()
+            except Empty:
+                pass
+
+
+def start_queue_logging(
+    queue_size: int,
+    drop_policy: DropPolicy = DropPolicy.drop_new,
+) -> BoundedQueueHandler:
+    """
+    Moves the root logger handlers behind a queue,
+    they are called from the listener thread
+    :return: BoundedQueueHandler
+    """
+    root = getLogger()
+    handlers: list[Handler] = list(root.handlers)
+
+    queue_handler = BoundedQueueHandler(Queue(maxsize=queue_size), drop_policy)
+    queue_handler.listener = QueueListener(
+        queue_handler.queue,
+        *handlers,
+        respect_handler_level=True,
+    )
+
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    root.addHandler(queue_handler)
+    queue_handler.listener.start()
+
+    return queue_handler
+
+
+def stop_queue_logging() -> None:
+    """
+    Flushes the queue and gives the handlers back to the root logger
+    """
+    root = getLogger()
+
+    for queue_handler in list(root.handlers):
+        if not isinstance(queue_handler, BoundedQueueHandler):
+            continue
+
+        root.removeHandler(queue_handler)
+
+        if queue_handler.listener is not None:
+            for handler in queue_handler.listener.handlers:
+                root.addHandler(handler)
+
+            queue_handler.listener.stop()
+            queue_handler.listener = None
+
+        queue_handler.close()
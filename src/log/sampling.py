@@ -0,0 +1,108 @@
+from datetime import datetime
+from random import random
+from typing import Any, Iterable
+from urllib.parse import urlsplit
+
+
+def match_url(path: str, url: str) -> bool:
+    """
+    `/static` matches `/static` and `/static/js/app.js`, but not `/statistics`
+    :return: bool
+    """
+    return path == url or path.startswith(url.rstrip("/") + "/")
+
+
+class TracesSampler:
+    """
+    Sentry `traces_sampler` with per-route rates by URL prefix, the longest prefix wins.
+    Excluded URLs are never traced. Without `slow_threshold` (default)
+    it is head sampling, unsampled requests skip the SDK span overhead.
+    `slow_threshold` opts into tail sampling:
+    every request is recorded and `before_send_transaction` drops the fast ones
+    that did not win the route rate draw
+    """
+
+    def __init__(
+        self,
+        sample_rate: float,
+        route_sample_rates: dict[str, float],
+        exclude_urls: Iterable[str] = (),
+        slow_threshold: float | None = None,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.route_sample_rates = sorted(
+            route_sample_rates.items(),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self.exclude_urls = tuple(exclude_urls)
+        self.slow_threshold = slow_threshold
+
+    def is_excluded(self, path: str) -> bool:
+        return any(match_url(path, url) for url in self.exclude_urls)
+
+    def get_sample_rate(self, path: str | None) -> float:
+        if path is None:
+            return self.sample_rate
+
+        if self.is_excluded(path):
+            return 0.0
+
+        for url, sample_rate in self.route_sample_rates:
+            if match_url(path, url):
+                return sample_rate
+
+        return self.sample_rate
+
+    def __call__(self, sampling_context: dict[str, Any]) -> float | bool:
+        path = (sampling_context.get("asgi_scope") or {}).get("path")
+
+        if path is not None and self.is_excluded(path):
+            return False
+
+        if sampling_context.get("parent_sampled") is not None:
+            return sampling_context["parent_sampled"]
+
+        if self.slow_threshold is not None:
+            return True
+
+        return self.get_sample_rate(path)
+
+    @classmethod
+    def get_path(cls, event: dict[str, Any]) -> str | None:
+        url = (event.get("request") or {}).get("url")
+
+        if url:
+            return urlsplit(url).path
+
+        return event.get("transaction")
+
+    @classmethod
+    def get_duration(cls, event: dict[str, Any]) -> float | None:
+        started_at, finished_at = event.get("start_timestamp"), event.get("timestamp")
+
+        if isinstance(started_at, datetime) and isinstance(finished_at, datetime):
+            return (finished_at - started_at).total_seconds()
+
+        if all(isinstance(value, (int, float)) for value in (started_at, finished_at)):
+            return finished_at - started_at
+
+        return None
+
+    def before_send_transaction(
+        self,
+        event: dict[str, Any],
+        hint: dict[str, Any],
+    ) -> dict[str, Any] | None:
+        if self.slow_threshold is None:
+            return event
+
+        duration = self.get_duration(event)
+
+        if duration is not None and duration >= self.slow_threshold:
+            return event
+
+        if random() < self.get_sample_rate(self.get_path(event)):
+            return event
+
+        return None
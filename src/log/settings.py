@@ -5,10 +5,20 @@ from typing import Any, Literal
 from pydantic import BaseModel, computed_field, field_validator
 from pydantic_core.core_schema import ValidationInfo
 
+from log.handlers import DropPolicy
+
 
 class LoggingSettings(BaseModel):
     sentry: str | None = None
 
+    traces_sample_rate: float = 0.05
+    traces_route_sample_rates: dict[str, float] = {}
+    # Static, docs, openapi and metrics URLs are added from the app settings
+    traces_exclude_urls: list[str] = ["/docs", "/redoc", "/health"]
+    # Seconds, opt-in tail sampling: every request is traced in-process and
+    # only the slow ones plus the `traces_sample_rate` share are sent
+    traces_slow_threshold: float | None = None
+
     version: int = 1
     disable_existing_loggers: bool = False
     encoding: str = "UTF-8"
@@ -28,6 +38,14 @@ class LoggingSettings(BaseModel):
 
     log_datetime_format: str = "%Y-%m-%d %H:%M:%S"
 
+    console_formatter: Literal["base", "colour", "json"] = "colour"
+    file_formatter: Literal["base", "colour", "json"] = "base"
+
+    # Handlers are called from a listener thread, records over `queue_size` are dropped
+    queue_handler: bool = True
+    queue_size: int = 10_000
+    queue_drop_policy: DropPolicy = DropPolicy.drop_new
+
     rotating_file_handler: bool = False
     logs_dir: str | Path = "logs"
     filename: str | Path = "app.log"
@@ -43,6 +61,33 @@ class LoggingSettings(BaseModel):
     ) -> str:
         return value.upper()
 
+    @field_validator("traces_sample_rate")
+    def traces_sample_rate_validator(
+        cls,
+        value: float,
+        info: ValidationInfo,
+        **kwargs,
+    ) -> float:
+        if not 0 <= value <= 1:
+            raise ValueError(f"`{info.field_name}` must be between 0 and 1")
+
+        return value
+
+    @field_validator("traces_route_sample_rates")
+    def traces_route_sample_rates_validator(
+        cls,
+        value: dict[str, float],
+        info: ValidationInfo,
+        **kwargs,
+    ) -> dict[str, float]:
+        for url, sample_rate in value.items():
+            if not 0 <= sample_rate <= 1:
+                raise ValueError(
+                    f"`{info.field_name}` for `{url}` must be between 0 and 1"
+                )
+
+        return value
+
     @field_validator("logs_dir", mode="before")
     def logs_dir_validator(
         cls,
@@ -79,6 +124,10 @@ class LoggingSettings(BaseModel):
                 "fmt": self.log_format,
                 "datefmt": self.log_datetime_format,
             },
+            "json": {
+                "()": "log.formatters.JSONFormatter",
+                "datefmt": self.log_datetime_format,
+            },
         }
 
     @computed_field
@@ -88,12 +137,12 @@ class LoggingSettings(BaseModel):
             "console": {
                 "class": "logging.StreamHandler",
                 "level": self.loglevel,
-                "formatter": "colour",
+                "formatter": self.console_formatter,
             },
             "rotating_file": {
                 "class": "logging.handlers.RotatingFileHandler",
                 "level": self.loglevel,
-                "formatter": "base",
+                "formatter": self.file_formatter,
                 "filename": self.filename,
                 "maxBytes": self.max_bytes,
                 "encoding": self.encoding,
@@ -1,9 +1,10 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 
 from core.lifespan import Lifespan
 from core.middlewares import register_middlewares
 from core.routers import register_routers
 from core.settings import settings
+from database.utils import get_request_sessions
 from exceptions.handlers import register_exc_handlers
 
 app = FastAPI(
@@ -15,6 +16,7 @@ app = FastAPI(
     redoc_url=None,
     swagger_ui_oauth2_redirect_url=None,
     openapi_url=settings.docs.openapi_url,
+    dependencies=[Depends(get_request_sessions)],
 )
 
 # ====================================|Middlewares|===================================== #
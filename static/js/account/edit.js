@@ -398,18 +398,22 @@ class AccountEditorFactory {
 }
 
 
-function startEditors() {
-    const accountEditorFactory = new AccountEditorFactory();
+const accountEditorFactory = new AccountEditorFactory();
+
+export function startEditor(account) {
+    const accountEditor = accountEditorFactory.makeEditor(account);
 
+    accountEditor.init();
+}
+
+function startEditors() {
     let accounts = document.getElementsByClassName(accountBaseClass);
 
     for (let index = 0; index < accounts.length; index++) {
         let account = accounts[index];
 
         if (account.classList.length == 1) {
-            const accountEditor = accountEditorFactory.makeEditor(account);
-            
-            accountEditor.init();
+            startEditor(account);
         }
     }
 }
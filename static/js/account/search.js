@@ -1,6 +1,6 @@
 "use strict";
 
-import {getValueOrNull} from "../utils.js";
+import {getValueOrNull, showElement, hideElement} from "../utils.js";
 
 const searchButtonClass = "search-button";
 
@@ -9,6 +9,13 @@ const searchButtons = document.getElementsByClassName(searchButtonClass);
 const searchFormClass = "search__item";
 const searchInputClass  = "search-input";
 
+const searchResultClass = "search-result";
+const searchMoreButtonClass = "search-result__more-button";
+const accountReadTemplateClass = "account-read-template";
+const detailsTemplateClass = "account-details-template";
+
+const searchPageURL = "/accounts/search";
+
 
 function setupSearch() {
     if (searchButtons) {
@@ -27,4 +34,122 @@ function setupSearch() {
     }
 }
 // // // // // // // // // // // // // // // // // // // // // // // // // // // // // // 
+class SearchResultLoader {
+    #searchResult;
+    #moreButton;
+
+    #accountTemplate;
+    #detailsTemplate;
+
+    #startEditor;
+
+    #isLoading = false;
+
+    constructor(searchResult, moreButton, startEditor) {
+        this.#searchResult = searchResult;
+        this.#moreButton = moreButton;
+        this.#startEditor = startEditor;
+
+        this.#accountTemplate = document.querySelector(`.${accountReadTemplateClass}`);
+        this.#detailsTemplate = document.querySelector(`.${detailsTemplateClass}`);
+    }
+
+    init() {
+        this.#moreButton.addEventListener("click", this.loadNextPage.bind(this));
+    }
+
+    async loadNextPage() {
+        const cursor = this.#searchResult.dataset.nextCursor;
+
+        if (this.#isLoading || !cursor) {
+            return;
+        }
+
+        this.#isLoading = true;
+
+        try {
+            const page = await this.#fetchPage(cursor);
+
+            if (page) {
+                page.accounts.forEach(account => this.#appendAccount(account));
+                this.#setNextCursor(page.next_cursor);
+            }
+        } finally {
+            this.#isLoading = false;
+        }
+    }
+
+    async #fetchPage(cursor) {
+        const params = new URLSearchParams({
+            search: this.#searchResult.dataset.search,
+            cursor: cursor,
+        });
+
+        try {
+            const response = await fetch(`${searchPageURL}?${params}`, {
+                method: "GET",
+                cache: "no-cache",
+                credentials: "same-origin",
+            });
+
+            if (response.ok) {
+                return await response.json();
+            }
+        } catch(error) {
+            console.log("Error", error)
+        }
+
+        return null
+    }
+
+    #setNextCursor(cursor) {
+        if (cursor) {
+            this.#searchResult.dataset.nextCursor = cursor;
+            showElement(this.#moreButton, true);
+        } else {
+            delete this.#searchResult.dataset.nextCursor;
+            hideElement(this.#moreButton, true);
+        }
+    }
+
+    #appendAccount(account) {
+        const accountNode = document.importNode(this.#accountTemplate.content, true);
+        const accountBase = accountNode.firstElementChild;
+
+        accountBase.querySelector(".account__container").id = account.id;
+        accountBase.querySelector(".account-title__name").value = account.name;
+
+        const detailsContainer = accountBase.querySelector(".account-details__container");
+        const detailsAddRowButton = accountBase.querySelector(".account-details__add-row-button");
+
+        for (const [fieldName, fieldValue] of Object.entries(account.data)) {
+            const detailsNode = document.importNode(this.#detailsTemplate.content, true);
+
+            detailsNode.querySelector(".account-detail__name").value = fieldName;
+            detailsNode.querySelector(".account-detail__value").value = fieldValue;
+
+            detailsContainer.insertBefore(detailsNode, detailsAddRowButton);
+        }
+
+        this.#searchResult.appendChild(accountBase);
+
+        this.#startEditor(accountBase);
+    }
+}
+
+
+async function setupSearchResultLoader() {
+    const searchResult = document.querySelector(`.${searchResultClass}`);
+    const moreButton = document.querySelector(`.${searchMoreButtonClass}`);
+
+    if (searchResult && moreButton) {
+        // Only the search result page loads the editors
+        const {startEditor} = await import("./edit.js");
+        const loader = new SearchResultLoader(searchResult, moreButton, startEditor);
+
+        loader.init();
+    }
+}
+// // // // // // // // // // // // // // // // // // // // // // // // // // // // // // 
 setupSearch();
+setupSearchResultLoader();